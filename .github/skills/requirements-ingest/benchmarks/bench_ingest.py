@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Requirements Ingest Benchmarks
+Times each pipeline stage (load, split, classify, glossary, serialize) on
+reproducible synthetic corpora, reports throughput and peak memory to a JSON
+results file, and flags regressions against a stored baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Add src directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir.parent / "src"))
+sys.path.insert(0, str(current_dir))
+
+from requirements_ingest import RequirementsIngestor, SourceDocument, TextSignals
+from corpus import FORMATS, generate_corpus
+
+STAGES = ("load", "split", "classify", "glossary", "serialize")
+DEFAULT_BASELINE = current_dir / "baseline.json"
+
+KB = 1024
+MB = 1024 * 1024
+
+# (file_count, file_size) per format
+PRESETS = {
+    "quick": [(1, 1 * KB), (100, 1 * KB), (1, 1 * MB)],
+    "standard": [(1, 1 * KB), (100, 1 * KB), (100, 64 * KB), (1, 1 * MB), (1, 10 * MB)],
+    "full": [(1, 1 * KB), (100, 1 * KB), (10000, 1 * KB), (100, 1 * MB), (1, 100 * MB)],
+}
+
+_CANDIDATE = TextSignals(word_count=0, is_candidate=True, tags=[], confidence=0.0)
+_NOT_CANDIDATE = TextSignals(word_count=0, is_candidate=False, tags=[], confidence=0.0)
+
+
+def parse_size(value: str) -> int:
+    """'64KB' / '1MB' / '512' -> bytes"""
+    value = value.strip().upper()
+    for suffix, factor in (("KB", KB), ("MB", MB), ("B", 1)):
+        if value.endswith(suffix):
+            return int(float(value[:-len(suffix)]) * factor)
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    if size >= MB and size % MB == 0:
+        return f"{size // MB}MB"
+    if size >= KB and size % KB == 0:
+        return f"{size // KB}KB"
+    return f"{size}B"
+
+
+def run_stages(ingestor: RequirementsIngestor, files: List[str], work_dir: Path,
+               on_stage_start=None, on_stage_end=None) -> Tuple[Dict[str, float], int]:
+    """Run the pipeline stage by stage; returns ({stage: seconds}, chunk count).
+
+    The ingestor's own handlers are used for every stage: splitting and
+    classification are temporarily replaced by recorders so that each stage
+    can be timed on its own.
+    """
+    timings = {}
+
+    def start(stage: str) -> float:
+        if on_stage_start:
+            on_stage_start(stage)
+        return time.perf_counter()
+
+    def end(stage: str, started: float) -> None:
+        timings[stage] = time.perf_counter() - started
+        if on_stage_end:
+            on_stage_end(stage)
+
+    # Stage 1: load = read + hash + format extraction (PDF pages, DOCX paragraphs, email body)
+    segments = []      # Text still to be split into chunks
+    paragraphs = []    # Atomic units (DOCX paragraphs) that go straight to classification
+    current = {}
+
+    def record_segment(text, source_file, location_hint, offset=0, limit=None):
+        segments.append((text, source_file, location_hint, offset, limit))
+        return []
+
+    def record_paragraph(text):
+        paragraphs.append((text, current["path"], "paragraph"))
+        return _NOT_CANDIDATE
+
+    ingestor._split_into_chunks = record_segment
+    ingestor._scan_text = record_paragraph
+    started = start("load")
+    try:
+        for path in files:
+            current["path"] = path
+            with SourceDocument.open(path) as source:
+                source.sha256()
+                ingestor._process_single_file(source)
+    finally:
+        del ingestor._split_into_chunks, ingestor._scan_text
+    end("load", started)
+
+    # Stage 2: split = sentence packing only
+    pieces = list(paragraphs)
+
+    def record_piece(text, source_file, location_hint, signals=None, span=None):
+        pieces.append((text, source_file, location_hint))
+
+    ingestor._scan_text = lambda text: _CANDIDATE
+    ingestor._create_chunk = record_piece
+    started = start("split")
+    try:
+        for text, source_file, location_hint, offset, limit in segments:
+            ingestor._split_into_chunks(text, source_file, location_hint, offset, limit)
+    finally:
+        del ingestor._scan_text, ingestor._create_chunk
+    end("split", started)
+
+    # Stage 3: classify = keyword scan, tags, confidence, chunk creation
+    started = start("classify")
+    chunks = []
+    for text, source_file, location_hint in pieces:
+        signals = ingestor._scan_text(text)
+        if signals.is_candidate:
+            chunks.append(ingestor._create_chunk(text, source_file, location_hint, signals))
+    end("classify", started)
+
+    # Stage 4: glossary = per-file candidates + glossary output
+    started = start("glossary")
+    by_file: Dict[str, List[str]] = {}
+    for chunk in chunks:
+        by_file.setdefault(chunk.source_file, []).append(chunk.text)
+    terms: Dict[str, None] = {}
+    for texts in by_file.values():
+        terms.update(dict.fromkeys(ingestor._extract_glossary_suspects(' '.join(texts))))
+    glossary = ingestor._create_glossary_output("BENCH", list(terms), chunks)
+    end("glossary", started)
+
+    # Stage 5: serialize = write every output artifact
+    started = start("serialize")
+    requirements_output = {
+        "project_id": "BENCH",
+        "generated_at": datetime.now().isoformat(),
+        "version": "1.0",
+        "total_requirements": len(chunks),
+        "requirements": [ingestor._chunk_to_dict(chunk) for chunk in chunks],
+        "glossary_suspects": list(terms),
+        "processing_summary": {}
+    }
+    processing_log = {"project_id": "BENCH", "input_files": [], "processing_stats": {}, "errors": [], "warnings": []}
+    original_base = ingestor.output_base_dir
+    ingestor.output_base_dir = work_dir / "outputs"
+    try:
+        ingestor._save_outputs("BENCH", requirements_output, processing_log, glossary, files)
+    finally:
+        ingestor.output_base_dir = original_base
+        shutil.rmtree(work_dir / "outputs", ignore_errors=True)
+    end("serialize", started)
+
+    return timings, len(chunks)
+
+
+def measure_peaks(ingestor: RequirementsIngestor, files: List[str], work_dir: Path) -> Dict[str, float]:
+    """Peak traced memory (MB) per stage, from one extra run under tracemalloc"""
+    peaks = {}
+
+    def on_start(stage):
+        tracemalloc.reset_peak()
+
+    def on_end(stage):
+        peaks[stage] = round(tracemalloc.get_traced_memory()[1] / MB, 2)
+
+    tracemalloc.start()
+    try:
+        run_stages(ingestor, files, work_dir, on_start, on_end)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def benchmark_case(file_format: str, file_count: int, file_size: int, corpus_dir: Path, work_dir: Path,
+                   repeat: int, seed: int, memory: bool) -> Dict[str, Any]:
+    """Benchmark one (format, file count, file size) corpus"""
+    files = generate_corpus(corpus_dir, file_format, file_count, file_size, seed)
+    corpus_bytes = sum(os.path.getsize(f) for f in files)
+    ingestor = RequirementsIngestor(output_base_dir=str(work_dir / "outputs"))
+
+    best: Dict[str, float] = {}
+    chunk_count = 0
+    for _ in range(repeat):
+        timings, chunk_count = run_stages(ingestor, files, work_dir)
+        for stage, seconds in timings.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+
+    peaks = measure_peaks(ingestor, files, work_dir) if memory else {}
+
+    stages = {}
+    for stage in STAGES:
+        seconds = best[stage]
+        stages[stage] = {
+            "seconds": round(seconds, 6),
+            "mb_per_s": round(corpus_bytes / MB / seconds, 2) if seconds else None,
+            "chunks_per_s": round(chunk_count / seconds, 1) if seconds else None,
+            "peak_mb": peaks.get(stage)
+        }
+
+    total = sum(best.values())
+    return {
+        "case": f"{file_format}/{file_count}x{format_size(file_size)}",
+        "format": file_format,
+        "files": file_count,
+        "file_size": file_size,
+        "corpus_bytes": corpus_bytes,
+        "chunks": chunk_count,
+        "total_seconds": round(total, 6),
+        "total_mb_per_s": round(corpus_bytes / MB / total, 2) if total else None,
+        "stages": stages
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                        min_seconds: float = 0.005) -> List[str]:
+    """Stage timings slower than baseline * (1 + threshold); sub-min_seconds timings are ignored as noise"""
+    baseline_cases = {case["case"]: case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        reference = baseline_cases.get(case["case"])
+        if not reference:
+            continue
+        for stage, data in case["stages"].items():
+            before = reference["stages"].get(stage, {}).get("seconds")
+            after = data["seconds"]
+            if before is None or max(before, after) < min_seconds:
+                continue
+            if after > before * (1 + threshold):
+                regressions.append(f"{case['case']} {stage}: {before:.4f}s -> {after:.4f}s (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    """CLI interface for the benchmark suite"""
+    parser = argparse.ArgumentParser(
+        description="Requirements Ingest - pipeline benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Quick preset, compared against benchmarks/baseline.json
+  python benchmarks/bench_ingest.py
+
+  # Full matrix (up to 10k files and 100 MB inputs), results to a file
+  python benchmarks/bench_ingest.py --preset full --output bench_results.json
+
+  # One custom case, then store it as the new baseline
+  python benchmarks/bench_ingest.py --formats pdf --files 100 --size 64KB --save-baseline
+        """
+    )
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick", help="Corpus matrix (default: quick)")
+    parser.add_argument("--formats", default=",".join(FORMATS), help=f"Comma-separated formats (default: {','.join(FORMATS)})")
+    parser.add_argument("--files", type=int, help="File count for a single custom case (overrides --preset)")
+    parser.add_argument("--size", help="File size for a single custom case, e.g. 1KB, 64KB, 100MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the fastest is reported (default: 3)")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus random seed (default: 42)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--corpus-dir", help="Keep generated corpora here for reuse (default: temporary)")
+    parser.add_argument("--output", default="bench_results.json", help="Results file (default: bench_results.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (default: 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    if args.files or args.size:
+        matrix = [(args.files or 1, parse_size(args.size or "1KB"))]
+    else:
+        matrix = PRESETS[args.preset]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ingest-bench-"))
+    corpus_dir = Path(args.corpus_dir) if args.corpus_dir else work_dir / "corpus"
+
+    print("⏱️ Requirements Ingest Benchmarks")
+    print("=" * 60)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "preset": None if (args.files or args.size) else args.preset,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "cases": []
+    }
+
+    try:
+        for file_format in formats:
+            for file_count, file_size in matrix:
+                case = benchmark_case(file_format, file_count, file_size, corpus_dir, work_dir,
+                                      args.repeat, args.seed, not args.no_memory)
+                results["cases"].append(case)
+                stage_summary = "  ".join(f"{stage} {case['stages'][stage]['seconds'] * 1000:.1f}ms" for stage in STAGES)
+                print(f"📊 {case['case']:<22} {case['chunks']:>7} chunks  {case['total_mb_per_s'] or 0:>8} MB/s  {stage_summary}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
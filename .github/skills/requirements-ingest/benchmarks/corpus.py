@@ -0,0 +1,156 @@
+"""
+Synthetic corpus generators for requirements-ingest benchmarks
+Writes reproducible MD, TXT, EML, DOCX and PDF inputs of a target size.
+DOCX and PDF files are written directly, so no extra dependencies are needed.
+"""
+
+import random
+import zipfile
+from pathlib import Path
+from typing import List
+from xml.sax.saxutils import escape
+
+FORMATS = ("md", "txt", "eml", "docx", "pdf")
+
+_SUBJECTS = ["The system", "The user", "The application", "The platform", "Each administrator",
+             "The API", "The reporting module", "The payment service", "The mobile app", "The database"]
+_MODALS = ["shall", "must", "will", "should", "might", "needs to"]
+_ACTIONS = ["authenticate users", "store audit records", "display the dashboard", "calculate totals",
+            "export reports in PDF format", "encrypt customer data", "respond to search requests",
+            "support concurrent sessions", "comply with GDPR regulation", "notify the assigned engineer"]
+_QUALIFIERS = ["within {n} seconds", "for {n} concurrent users", "with {n}% availability",
+               "under a budget of ${n}", "as provided by the SAP integration", "before Phase 2 release",
+               "using AES-256 encryption", "when the Request Manager approves", "unless out of scope", ""]
+_LINES_PER_PDF_PAGE = 45
+
+
+def _sentence(rng: random.Random) -> str:
+    """One requirement-like sentence"""
+    qualifier = rng.choice(_QUALIFIERS).format(n=rng.randint(2, 10000))
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(_MODALS)} {rng.choice(_ACTIONS)} {qualifier}".rstrip() + "."
+
+
+def _paragraphs(rng: random.Random, target_bytes: int) -> List[str]:
+    """Paragraphs of 3-8 sentences until roughly target_bytes of text"""
+    paragraphs = []
+    size = 0
+    while size < target_bytes:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return paragraphs
+
+
+def _write_md(path: Path, paragraphs: List[str]) -> None:
+    lines = ["# Generated Requirements", ""]
+    for i, paragraph in enumerate(paragraphs):
+        if i % 5 == 0:
+            lines.extend([f"## Section {i // 5 + 1}", ""])
+        lines.extend([paragraph, ""])
+    path.write_text("\n".join(lines), encoding='utf-8')
+
+
+def _write_txt(path: Path, paragraphs: List[str]) -> None:
+    path.write_text("\n\n".join(paragraphs), encoding='utf-8')
+
+
+def _write_eml(path: Path, paragraphs: List[str]) -> None:
+    headers = [
+        "From: product@example.com",
+        "To: development@example.com",
+        "Subject: Generated requirements",
+        "Message-ID: <generated@example.com>",
+        "Content-Type: text/plain; charset=utf-8",
+        "",
+    ]
+    path.write_text("\n".join(headers) + "\n\n".join(paragraphs), encoding='utf-8')
+
+
+def _write_docx(path: Path, paragraphs: List[str]) -> None:
+    """Minimal WordprocessingML package: one <w:p> per paragraph"""
+    body = "".join(f"<w:p><w:r><w:t>{escape(p)}</w:t></w:r></w:p>" for p in paragraphs)
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{body}</w:body></w:document>')
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Override PartName="/word/document.xml" '
+                     'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+                     '</Types>')
+    rels = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", content_types)
+        package.writestr("_rels/.rels", rels)
+        package.writestr("word/document.xml", document)
+
+
+def _write_pdf(path: Path, paragraphs: List[str]) -> None:
+    """Minimal text-layer PDF (Helvetica), ~45 wrapped lines per page"""
+    lines = []
+    for paragraph in paragraphs:
+        words = paragraph.split()
+        while words:
+            line = []
+            while words and len(" ".join(line + words[:1])) <= 90:
+                line.append(words.pop(0))
+            lines.append(" ".join(line or [words.pop(0)]))
+    pages = [lines[i:i + _LINES_PER_PDF_PAGE] for i in range(0, len(lines), _LINES_PER_PDF_PAGE)] or [[]]
+
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_ref = 2 + 2 * len(pages)
+    page_refs = []
+    for page_lines in pages:
+        escaped = [l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in page_lines]
+        stream = ("BT /F1 10 Tf 40 760 Td 16 TL " + " ".join(f"({l}) '" for l in escaped) + " ET").encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_ref, len(objects)))
+        page_refs.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % r for r in page_refs) + b"] /Count %d >>" % len(page_refs))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_ref)
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref))
+
+
+_WRITERS = {
+    "md": _write_md,
+    "txt": _write_txt,
+    "eml": _write_eml,
+    "docx": _write_docx,
+    "pdf": _write_pdf,
+}
+
+
+def generate_corpus(output_dir: Path, file_format: str, file_count: int, file_size: int, seed: int = 42) -> List[str]:
+    """Write file_count files of ~file_size bytes of text each; identical for the same arguments and seed"""
+    if file_format not in _WRITERS:
+        raise ValueError(f"Unknown format {file_format!r}; expected one of {', '.join(FORMATS)}")
+
+    corpus_dir = Path(output_dir) / f"{file_format}-{file_count}x{file_size}-s{seed}"
+    extension = "eml" if file_format == "eml" else file_format
+    paths = [corpus_dir / f"doc-{i:05d}.{extension}" for i in range(file_count)]
+
+    # Reuse a complete corpus from an earlier run
+    if corpus_dir.exists() and all(p.exists() for p in paths):
+        return [str(p) for p in paths]
+
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{seed}-{file_format}-{file_count}-{file_size}")
+    for path in paths:
+        _WRITERS[file_format](path, _paragraphs(rng, file_size))
+    return [str(p) for p in paths]
@@ -7,48 +7,1540 @@ Outputs to structured folder system for downstream processing.
 import json
 import re
 import os
+import sys
 import hashlib
+import io
+import mmap
+from array import array
+import time
+import copy
+import struct
+import shutil
+import threading
+import importlib
+from bisect import bisect_right
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterator, Iterable, AsyncIterator, NamedTuple, FrozenSet, Callable
 from pathlib import Path
-from dataclasses import dataclass
-import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+
+TOOL_VERSION = "requirements-ingest-v2.1"
+CHUNK_CACHE_FORMAT = 3  # Bump whenever a handler's output changes (3: email attachments)
+PDF_PAGE_CACHE_FORMAT = 2  # 2: key includes XObject and font resources
+PDF_PAGES_PER_TASK = 8  # Page-parallel PDF extraction needs at least two tasks' worth of pages
+PDF_EXTRACTION_MODES = ('tiered', 'layout')
+JSON_BACKENDS = ('auto', 'orjson', 'json')
+HANDLER_ENTRY_POINT_GROUP = "requirements_ingest.handlers"
+
+# Format handlers by file extension. A handler is the name of a
+# RequirementsIngestor method, a "module:function" string imported on first
+# use, or a callable(ingestor, source) -> List[RequirementChunk]. Format
+# libraries (PDF, DOCX, email) are imported inside the handlers, so runs that
+# never see those formats never pay for the imports. Maildir directories have
+# no extension and always go to _process_maildir.
+_HANDLERS: Dict[str, Any] = {
+    '.pdf': '_process_pdf',
+    '.docx': '_process_docx',
+    '.doc': '_process_docx',
+    '.md': '_process_markdown',
+    '.markdown': '_process_markdown',
+    '.eml': '_process_email',
+    '.email': '_process_email',
+    '.txt': '_process_email',
+    '.mbox': '_process_mbox',
+}
+_FALLBACK_HANDLER = '_process_text'  # Anything else is treated as plain text
+_entry_points_loaded = False
+
+
+def register_handler(extensions: Any, handler: Any) -> None:
+    """Route files with the given extension(s) to handler(ingestor, source) -> List[RequirementChunk].
+    
+    handler may also be a "module:function" string, imported on first use.
+    Registrations replace built-in handlers. Worker processes see them when
+    they are forked; otherwise register from an imported module or an entry point.
+    """
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    for extension in extensions:
+        extension = extension.lower()
+        _HANDLERS[extension if extension.startswith('.') else f".{extension}"] = handler
+
+
+def _load_entry_point_handlers() -> None:
+    """Add handlers advertised by installed packages (name = extension, value = callable).
+    
+    Discovery scans installed distributions, so it only happens once an
+    extension without a built-in or registered handler turns up; entry points
+    never replace those handlers.
+    """
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    
+    try:
+        discovered = entry_points(group=HANDLER_ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        discovered = entry_points().get(HANDLER_ENTRY_POINT_GROUP, [])
+    for entry_point in discovered:
+        extension = entry_point.name.lower()
+        _HANDLERS.setdefault(extension if extension.startswith('.') else f".{extension}", entry_point)
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str) -> Any:
+    """Import an optional dependency on first use; None when it is not installed"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+_SENTENCE_RE = re.compile(r'[^.!?\s](?:[^.!?]*[^.!?\s])?')  # One stripped sentence between runs of [.!?]
+_MARKDOWN_HEADER_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_MBOX_ESCAPED_FROM_RE = re.compile(rb'>+From ')
+_SAFE_PROJECT_ID_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')  # One path component; no separators, no leading dot
+_encode_json_string = json.encoder.encode_basestring  # Same escaping as json.dumps(ensure_ascii=False)
+_COMPACT_SEPARATORS = (',', ':')
+_TAG_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}  # One shared tuple per distinct tag combination
+CONTENT_ID_LENGTHS = (8, 12, 16, 24, 32)  # Hex digits of the content digest; longer ones resolve prefix collisions
+
+
+def content_digest(text: str) -> bytes:
+    """BLAKE2b digest of whitespace-normalized text: the identity behind requirement IDs and dedupe"""
+    return hashlib.blake2b(" ".join(text.split()).encode('utf-8'), digest_size=16).digest()
+
+
+def content_id(digest: bytes, length: int = CONTENT_ID_LENGTHS[0]) -> str:
+    """Requirement ID for a content digest, e.g. R-3f9a0c12"""
+    return f"R-{digest.hex()[:length]}"
+
 
-# File format handlers
-try:
-    import PyPDF2
-    import pdfplumber
-except ImportError:
-    PyPDF2 = None
-    pdfplumber = None
-
-try:
-    from docx import Document
-except ImportError:
-    Document = None
-
-try:
-    from email import message_from_string
-    from email.policy import default
-except ImportError:
-    message_from_string = None
-
-@dataclass
 class RequirementChunk:
-    """Single atomic requirement with metadata"""
-    id: str
-    source_file: str
-    location_hint: str
-    text: str
+    """Single atomic requirement with metadata.
+    
+    Slotted, with interned source/location strings and tags stored as a
+    tuple shared by every chunk with the same classification, so batches of
+    hundreds of thousands of chunks carry little per-object overhead.
+    
+    sources lists every location of a requirement that occurred more than
+    once in a deduplicated batch (the chunk's own location first).
+    cluster_id names the near-duplicate cluster the chunk belongs to, when
+    near-duplicate detection is on and it has reworded copies.
+    
+    span holds the chunk's (start, end) character offsets in the text of its
+    location unit (document, email body or PDF page) when the ingestor runs
+    with spans=True. A chunk created with a buffer instead of text keeps no
+    copy of its own: text is re-derived from buffer[start:end] with the same
+    sentence normalization the splitter applies, each time it is read.
+    """
+    
+    __slots__ = ('id', 'source_file', 'location_hint', '_text', 'tags', 'confidence', 'span', '_buffer', 'sources',
+                 'cluster_id')
+    
+    def __init__(self, id: str, source_file: str, location_hint: str, text: Optional[str], tags: Any, confidence: float,
+                 span: Optional[Tuple[int, int]] = None, buffer: Optional[str] = None):
+        self.id = id
+        self.source_file = sys.intern(source_file)
+        self.location_hint = sys.intern(location_hint)
+        self._text = text
+        tags = tuple(tags)
+        self.tags: Tuple[str, ...] = _TAG_TUPLES.setdefault(tags, tags)
+        self.confidence = confidence
+        self.span = tuple(span) if span is not None else None
+        self._buffer = buffer if text is None else None
+        self.sources: Optional[List[Dict[str, Any]]] = None
+        self.cluster_id: Optional[str] = None
+    
+    @property
+    def text(self) -> str:
+        if self._text is not None:
+            return self._text
+        return " ".join(_SENTENCE_RE.findall(self._buffer, *self.span))
+    
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+        self._buffer = None
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, RequirementChunk):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return (f"RequirementChunk(id={self.id!r}, source_file={self.source_file!r}, location_hint={self.location_hint!r}, "
+                f"text={self.text!r}, tags={list(self.tags)!r}, confidence={self.confidence!r})")
+    
+    def location(self) -> Dict[str, Any]:
+        """Where this chunk was found: source file, location hint and span when known"""
+        location = {"source_file": self.source_file, "location_hint": self.location_hint}
+        if self.span is not None:
+            location["span"] = {"start": self.span[0], "end": self.span[1]}
+        return location
+    
+    def astuple(self) -> Tuple[Any, ...]:
+        """Field values in declaration order, text materialized (the chunk cache stores chunks this way)"""
+        return (self.id, self.source_file, self.location_hint, self.text, self.tags, self.confidence, self.span)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Output record (confidence rounded to 2 places; span offsets when known)"""
+        record = {
+            "id": self.id,
+            "source_file": self.source_file,
+            "location_hint": self.location_hint,
+            "text": self.text,
+            "tags": list(self.tags),
+            "confidence": round(self.confidence, 2)
+        }
+        if self.span is not None:
+            record["span"] = {"start": self.span[0], "end": self.span[1]}
+        if self.sources is not None:
+            record["sources"] = self.sources
+        if self.cluster_id is not None:
+            record["cluster_id"] = self.cluster_id
+        return record
+    
+    def to_json(self) -> str:
+        """Output record encoded straight to compact JSON, without building the dict.
+        
+        Identical to json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':')).
+        """
+        encoded = (f'{{"id":{_encode_json_string(self.id)},"source_file":{_encode_json_string(self.source_file)},'
+                   f'"location_hint":{_encode_json_string(self.location_hint)},"text":{_encode_json_string(self.text)},'
+                   f'"tags":[{",".join(map(_encode_json_string, self.tags))}],"confidence":{round(self.confidence, 2)!r}')
+        if self.span is not None:
+            encoded += f',"span":{{"start":{self.span[0]},"end":{self.span[1]}}}'
+        if self.sources is not None:
+            encoded += f',"sources":{json.dumps(self.sources, ensure_ascii=False, separators=_COMPACT_SEPARATORS)}'
+        if self.cluster_id is not None:
+            encoded += f',"cluster_id":{_encode_json_string(self.cluster_id)}'
+        return encoded + "}"
+
+
+def _chunk_default(obj: Any) -> Any:
+    """JSON fallback for RequirementChunk values nested in output documents"""
+    if isinstance(obj, RequirementChunk):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonSerializer:
+    """Encodes output documents to UTF-8 JSON: orjson when it is installed, the stdlib json module otherwise.
+    
+    Output is compact (no indentation or separator spaces) unless pretty=True,
+    which indents by two spaces. Documents may hold RequirementChunk objects
+    in place of their dicts: orjson converts them through to_dict() in C, and
+    the stdlib backend writes a top-level list of chunks straight from
+    RequirementChunk.to_json(). Only the backend name is stored, so the
+    serializer pickles cheaply into worker processes.
+    """
+    
+    def __init__(self, backend: str = 'auto', pretty: bool = False):
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"backend must be one of {', '.join(JSON_BACKENDS)}: {backend!r}")
+        if backend == 'orjson' and _optional_module("orjson") is None:
+            raise ValueError("backend 'orjson' requested but orjson is not installed")
+        self.backend = backend
+        self.pretty = pretty
+    
+    @property
+    def orjson(self) -> Any:
+        """The orjson module when it is the active backend, else None"""
+        return _optional_module("orjson") if self.backend != 'json' else None
+    
+    def dumps(self, obj: Any) -> bytes:
+        """Encode obj to UTF-8 JSON bytes"""
+        orjson = self.orjson
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if self.pretty else 0)
+            return orjson.dumps(obj, default=_chunk_default, option=option)
+        if self.pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False, default=_chunk_default).encode('utf-8')
+        if isinstance(obj, dict):
+            encode = json.JSONEncoder(ensure_ascii=False, separators=_COMPACT_SEPARATORS, default=_chunk_default).encode
+            members = []
+            for key, value in obj.items():
+                if isinstance(value, list) and value and isinstance(value[0], RequirementChunk):
+                    encoded = "[" + ",".join(chunk.to_json() for chunk in value) + "]"
+                else:
+                    encoded = encode(value)
+                members.append(f"{encode(str(key))}:{encoded}")
+            return ("{" + ",".join(members) + "}").encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=_COMPACT_SEPARATORS, default=_chunk_default).encode('utf-8')
+    
+    def dump(self, obj: Any, path: Path) -> None:
+        """Write obj to path as JSON"""
+        with open(path, 'wb') as f:
+            f.write(self.dumps(obj))
+
+
+class TextSignals(NamedTuple):
+    """Everything the keyword tables say about one piece of text"""
+    word_count: int
+    is_candidate: bool
     tags: List[str]
     confidence: float
 
+
+class KeywordMatcher:
+    """Precompiled one-pass matcher over all keyword tables.
+    
+    Every keyword (classification, candidacy and confidence words) is
+    deduplicated and looked up once against a single lowercased copy of the
+    chunk. Large tables are folded into one trie-shaped regex instead, whose
+    cost barely grows with the number of keywords; below REGEX_MIN_KEYWORDS,
+    CPython's substring search is faster than the regex engine. Both paths keep
+    the substring semantics of ``keyword in text``: keywords contained in a
+    longer regex match are implied by it, and the few keywords that can
+    overlap the end of another match are checked directly.
+    """
+    
+    REGEX_MIN_KEYWORDS = 200
+    _DIGIT = "0"  # Marker for "text contains a digit"
+    _DIGIT_RE = re.compile(r'\d')
+    
+    def __init__(self, classification_keywords: Dict[str, List[str]], requirement_indicators: List[str],
+                 confidence_keywords: Dict[str, List[str]]):
+        self.categories = [(category, frozenset(keywords)) for category, keywords in classification_keywords.items()]
+        self.indicators = frozenset(requirement_indicators)
+        self.strong = frozenset(confidence_keywords.get('strong', []))
+        self.vague = frozenset(confidence_keywords.get('vague', []))
+        
+        keywords = set(self.indicators | self.strong | self.vague)
+        for _, category_keywords in self.categories:
+            keywords |= category_keywords
+        keywords = sorted(k.lower() for k in keywords if k)
+        self._keywords = keywords
+        
+        self._pattern = None
+        if len(keywords) >= self.REGEX_MIN_KEYWORDS:
+            self._pattern = re.compile(self._trie_pattern(keywords) + r'|\d')
+            self._implied = {k: self._contained(k, keywords) for k in keywords}
+            self._implied.update((d, frozenset([self._DIGIT])) for d in '0123456789')
+            self._overlapping = self._overlap_targets(keywords)
+    
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        """Regex alternation with shared prefixes factored out (greedy = longest match)"""
+        trie: Dict[str, Any] = {}
+        for keyword in keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[''] = True
+        
+        def emit(node: Dict[str, Any]) -> str:
+            branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return f'(?:{body})?' if '' in node else body
+        
+        return emit(trie)
+    
+    @classmethod
+    def _contained(cls, keyword: str, keywords: List[str]) -> FrozenSet[str]:
+        """Keywords (and the digit marker) that occur wherever this keyword does"""
+        implied = {k for k in keywords if k in keyword}
+        if any(ch.isdigit() for ch in keyword):
+            implied.add(cls._DIGIT)
+        return frozenset(implied)
+    
+    @staticmethod
+    def _overlap_targets(keywords: List[str]) -> List[str]:
+        """Keywords that can start inside another keyword's match and run past its end"""
+        targets = []
+        for target in keywords:
+            for keyword in keywords:
+                if any(target.startswith(keyword[offset:]) and len(target) > len(keyword) - offset
+                       for offset in range(1, len(keyword))):
+                    targets.append(target)
+                    break
+        return targets
+    
+    def scan(self, text: str) -> TextSignals:
+        """Single pass over text returning candidacy, tags and confidence together"""
+        text_lower = text.lower()
+        word_count = len(text.split())
+        
+        if self._pattern is None:
+            found = {keyword for keyword in self._keywords if keyword in text_lower}
+            if self._DIGIT_RE.search(text_lower):
+                found.add(self._DIGIT)
+        else:
+            found = set()
+            implied = self._implied
+            for keyword in set(self._pattern.findall(text_lower)):
+                found |= implied.get(keyword, implied['0'])  # Non-ASCII digits map to the digit marker
+            
+            # findall() does not report overlapping matches; check the few keywords that can hide in one
+            for keyword in self._overlapping:
+                if keyword not in found and keyword in text_lower:
+                    found.add(keyword)
+        
+        # Skip very short texts
+        is_candidate = word_count >= 3 and not self.indicators.isdisjoint(found)
+        
+        tags = [category for category, category_keywords in self.categories if not category_keywords.isdisjoint(found)]
+        if not tags:
+            tags = ['functional']  # Default to functional if no other tags
+        
+        score = 0.5  # Base score
+        if not self.strong.isdisjoint(found):
+            score += 0.3  # Clear requirement language
+        if self._DIGIT in found:
+            score += 0.2  # Specific measurements
+        if not self.vague.isdisjoint(found):
+            score -= 0.3  # Vague language
+        if word_count > 50:
+            score -= 0.2  # Very long sentences
+        
+        return TextSignals(word_count, is_candidate, tags, max(0.0, min(1.0, score)))
+
+
+class GlossaryIndex:
+    """Inverted index from lowercase words to the chunks that contain them.
+    
+    Built in one pass over the chunks: each word maps to {chunk index: first
+    sentence index}, where sentences are the ``text.split('.')`` pieces used
+    for glossary contexts. Term lookups keep the substring semantics of
+    ``term.lower() in text.lower()`` by matching the term against the word
+    vocabulary rather than against every chunk.
+    """
+    
+    _WORD_RE = re.compile(r'[a-z]+')
+    
+    def __init__(self):
+        self.chunk_ids: List[str] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocab: Optional[List[str]] = None
+        self._vocab_blob = ""
+        self._vocab_starts: List[int] = []
+    
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index one chunk (chunks are numbered in the order they are added)"""
+        chunk_index = len(self.chunk_ids)
+        self.chunk_ids.append(chunk_id)
+        self._vocab = None
+        
+        for sentence_index, sentence in enumerate(text.lower().split('.')):
+            for word in self._WORD_RE.findall(sentence):
+                postings = self._postings.setdefault(word, {})
+                if chunk_index not in postings:
+                    postings[chunk_index] = sentence_index
+    
+    def _words_containing(self, part: str) -> List[str]:
+        """Vocabulary words that contain part, found with one search over the joined vocabulary"""
+        if self._vocab is None:
+            self._vocab = list(self._postings)
+            self._vocab_blob = "\n".join(self._vocab)
+            self._vocab_starts = []
+            offset = 0
+            for word in self._vocab:
+                self._vocab_starts.append(offset)
+                offset += len(word) + 1
+        
+        words = []
+        last = -1
+        pos = self._vocab_blob.find(part)
+        while pos != -1:
+            word_index = bisect_right(self._vocab_starts, pos) - 1
+            if word_index != last:
+                words.append(self._vocab[word_index])
+                last = word_index
+            pos = self._vocab_blob.find(part, pos + 1)
+        return words
+    
+    def lookup(self, term: str, text_of: Optional[Callable[[int], str]] = None) -> Dict[int, int]:
+        """Chunks containing term, as {chunk index: first sentence index} in chunk order.
+        
+        Purely alphabetic terms are answered from the index alone; other terms
+        are narrowed down by their alphabetic parts and confirmed with text_of.
+        """
+        term_lower = term.lower()
+        parts = self._WORD_RE.findall(term_lower)
+        if not parts:
+            return {}
+        
+        candidates: Optional[Dict[int, int]] = None
+        for part in parts:
+            matches: Dict[int, int] = {}
+            for word in self._words_containing(part):
+                for chunk_index, sentence_index in self._postings[word].items():
+                    if sentence_index < matches.get(chunk_index, sentence_index + 1):
+                        matches[chunk_index] = sentence_index
+            candidates = matches if candidates is None else {i: candidates[i] for i in candidates if i in matches}
+        
+        if parts == [term_lower]:
+            return dict(sorted(candidates.items()))
+        
+        # Spaces, digits or punctuation in the term: confirm against the chunk text
+        results = {}
+        for chunk_index in sorted(candidates):
+            sentences = text_of(chunk_index).lower().split('.')
+            if term_lower in '.'.join(sentences):
+                results[chunk_index] = next((i for i, sentence in enumerate(sentences) if term_lower in sentence), -1)
+        return results
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index that clusters reworded copies of a requirement in one pass.
+    
+    Each chunk is reduced to a MinHash signature over its word-bigram
+    shingles and filed under BANDS locality-sensitive band keys. Signatures
+    use one-permutation hashing: every shingle is hashed once and the hash
+    picks its bin, and bins no shingle landed in borrow from the next filled
+    bin (densification), so a signature costs one pass over the shingles
+    rather than one per permutation. Only chunks
+    that share a band key are compared, and they join the same cluster
+    (single linkage) when their estimated Jaccard similarity reaches the
+    threshold, so the cost grows with the number of chunks instead of the
+    number of pairs.
+    """
+    
+    NUM_PERM = 64  # Signature bins; the top 6 bits of a shingle hash select its bin
+    BANDS = 16  # 16 bands x 4 rows: pairs from ~0.5 similarity up become candidates
+    SHINGLE_WORDS = 2
+    _WORD_RE = re.compile(r'\w+')
+    _VALUE_BITS = 58
+    _EMPTY = 1 << _VALUE_BITS
+    
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+        self._ids: List[str] = []
+        self._confidence: List[float] = []
+        self._signatures: List[Optional[array]] = []
+        self._parent: List[int] = []
+        self._buckets: List[Dict[bytes, Any]] = [{} for _ in range(self.BANDS)]  # band key -> index or [indices]
+    
+    @classmethod
+    def signature(cls, text: str) -> Optional[array]:
+        """MinHash signature of text's lowercase word shingles (None for text without words)"""
+        words = cls._WORD_RE.findall(text.lower())
+        if not words:
+            return None
+        k = cls.SHINGLE_WORDS
+        shingles = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+        
+        bits = cls._VALUE_BITS
+        low = cls._EMPTY - 1
+        bins = [cls._EMPTY] * cls.NUM_PERM
+        for shingle in shingles:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            b = h >> bits
+            if h & low < bins[b]:
+                bins[b] = h & low
+        
+        # Densify: an empty bin takes the next filled bin's value, tagged with the distance
+        signature = array('Q', bins)
+        for i, value in enumerate(bins):
+            if value == cls._EMPTY:
+                distance = 1
+                while bins[(i + distance) % cls.NUM_PERM] == cls._EMPTY:
+                    distance += 1
+                signature[i] = bins[(i + distance) % cls.NUM_PERM] | (distance << bits)
+        return signature
+    
+    @staticmethod
+    def similarity(first: array, second: array) -> float:
+        """Estimated Jaccard similarity: the share of matching signature positions"""
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+    
+    def add(self, chunk_id: str, confidence: float, text: str) -> None:
+        """Index one chunk and merge it into the cluster of every similar chunk seen so far"""
+        index = len(self._ids)
+        self._ids.append(chunk_id)
+        self._confidence.append(confidence)
+        self._parent.append(index)
+        signature = self.signature(text)
+        self._signatures.append(signature)
+        if signature is None:
+            return
+        
+        raw = signature.tobytes()
+        width = len(raw) // self.BANDS
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            key = raw[band * width:(band + 1) * width]
+            members = buckets.get(key)
+            if members is None:
+                buckets[key] = index
+            elif isinstance(members, int):
+                candidates.add(members)
+                buckets[key] = [members, index]
+            else:
+                candidates.update(members)
+                members.append(index)
+        
+        for other in sorted(candidates):
+            if self._find(other) != self._find(index) and self.similarity(signature, self._signatures[other]) >= self.threshold:
+                self._union(other, index)
+    
+    def _find(self, index: int) -> int:
+        parent = self._parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]  # Path halving
+            index = parent[index]
+        return index
+    
+    def _union(self, first: int, second: int) -> None:
+        roots = sorted((self._find(first), self._find(second)))
+        self._parent[roots[1]] = roots[0]  # The earliest chunk stays the root
+    
+    def clusters(self) -> List[Dict[str, Any]]:
+        """Clusters of two or more chunks, in order of first member.
+        
+        The canonical representative is the member with the highest
+        confidence (the earliest one on ties).
+        """
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(self._ids)):
+            groups.setdefault(self._find(index), []).append(index)
+        
+        clusters = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            canonical = max(members, key=lambda i: (self._confidence[i], -i))
+            clusters.append({
+                "cluster_id": f"NDC-{len(clusters) + 1:04d}",
+                "canonical_id": self._ids[canonical],
+                "size": len(members),
+                "member_ids": [self._ids[i] for i in members]
+            })
+        return clusters
+
+
+class StageProfiler:
+    """Wall time, call count and tracemalloc peak per pipeline stage.
+    
+    Stages nest (split runs inside parse, classify inside split). Time is
+    exclusive of nested stages; peak memory is the highest traced allocation
+    above the level at stage entry, nested stages included, and is only
+    recorded while tracemalloc is tracing.
+    """
+    
+    STAGES = ('hash', 'parse', 'split', 'classify', 'glossary', 'serialize')
+    
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._stack: List[List[float]] = []  # [start_time, nested_time, start_memory, peak_memory]
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of stage name"""
+        import tracemalloc
+        
+        tracing = tracemalloc.is_tracing()
+        memory = 0
+        if tracing:
+            memory, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # The enclosing stage keeps the peak seen so far; ours starts fresh
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            tracemalloc.reset_peak()
+        frame = [time.perf_counter(), 0.0, memory, memory]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[0]
+            self._stack.pop()
+            if tracing:
+                frame[3] = max(frame[3], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] += elapsed
+                parent[3] = max(parent[3], frame[3])
+            stats = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_memory_kb": 0.0})
+            stats["seconds"] += elapsed - frame[1]
+            stats["calls"] += 1
+            stats["peak_memory_kb"] = max(stats["peak_memory_kb"], (frame[3] - frame[2]) / 1024)
+    
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Rounded stage stats in pipeline order"""
+        return self.merge({}, self.stages)
+    
+    @classmethod
+    def merge(cls, into: Dict[str, Dict[str, float]], stages: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        """Add stage stats into an accumulator (seconds and calls summed, peaks maxed)"""
+        for name in sorted(stages, key=lambda n: cls.STAGES.index(n) if n in cls.STAGES else len(cls.STAGES)):
+            stats = stages[name]
+            total = into.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_memory_kb": 0.0})
+            total["seconds"] = round(total["seconds"] + stats["seconds"], 6)
+            total["calls"] += stats["calls"]
+            total["peak_memory_kb"] = round(max(total["peak_memory_kb"], stats["peak_memory_kb"]), 1)
+        return into
+
+
+class _IngestSession:
+    """Running state of one batch: processing log, stats and glossary aggregated per chunk.
+    
+    Requirement IDs are assigned here, in input order, from the content
+    digest: an ID prefix already taken by different content moves on to a
+    longer prefix. With dedupe, a repeat of earlier content is dropped and its
+    location is added to the first occurrence's sources; without it, repeats
+    get numbered IDs (R-3f9a0c12-2). Given a near_duplicate_threshold, every
+    kept chunk is also filed in a NearDuplicateIndex.
+    """
+    
+    def __init__(self, project_id: str, files: List[str], dedupe: bool = True,
+                 near_duplicate_threshold: Optional[float] = None):
+        self.project_id = project_id
+        self.files = files
+        self.dedupe = dedupe
+        self.near_duplicate_index = (NearDuplicateIndex(near_duplicate_threshold)
+                                     if near_duplicate_threshold is not None else None)
+        self._ids_by_digest: Dict[bytes, List[Any]] = {}  # digest -> [ID, occurrences]
+        self._used_ids: set = set()
+        self.duplicate_sources: Dict[str, List[Dict[str, Any]]] = {}  # ID -> locations of later copies
+        self.last_duplicates: List[Tuple[str, RequirementChunk]] = []  # (ID, duplicate) from the latest file
+        self.start_time = datetime.now()
+        self.end_time = self.start_time
+        self.processing_log = {
+            "project_id": project_id,
+            "processing_session": {
+                "timestamp": self.start_time.isoformat(),
+                "version": "1.0",
+                "tool_version": TOOL_VERSION,
+                "user": os.environ.get("USERNAME", "unknown"),
+                "method": "traditional_script"
+            },
+            "input_files": [],
+            "processing_stats": {},
+            "errors": [],
+            "warnings": []
+        }
+        self.total_requirements = 0
+        self.total_confidence = 0.0
+        self.glossary_terms: Dict[str, None] = {}  # Ordered set
+        self.glossary_index = GlossaryIndex()
+        self.sidecar_offsets: List[int] = []
+        self.markdown: Optional[MarkdownReportWriter] = None  # Streams report rows while the batch runs
+        self.sidecar_path: Optional[Path] = None  # requirements.jsonl while in progress (*.partial)
+    
+    def add_file_result(self, file_info: Dict[str, Any], chunks: List[RequirementChunk], glossary_terms: List[str],
+                        error: Optional[str]) -> List[RequirementChunk]:
+        """Record one file's result and return the chunks it contributes (an error chunk on failure)"""
+        file_path = file_info["file_path"]
+        
+        if error is not None:
+            # Add error chunk for problematic files
+            chunks = [RequirementChunk(
+                id=f"R-ERROR-{self.total_requirements + 1:03d}",
+                source_file=file_path,
+                location_hint="file processing error",
+                text=f"Error processing file: {error}",
+                tags=["assumption"],
+                confidence=0.1
+            )]
+            self.processing_log["errors"].append(f"Failed to process {file_path}: {error}")
+            file_info["requirements_extracted"] = 1  # Error chunk
+        else:
+            self.glossary_terms.update(dict.fromkeys(glossary_terms))
+        
+        unique = []
+        self.last_duplicates = []
+        for chunk in chunks:
+            if error is None:
+                duplicate_of = self._assign_id(chunk)
+                if duplicate_of is not None:
+                    self.duplicate_sources.setdefault(duplicate_of, []).append(chunk.location())
+                    self.last_duplicates.append((duplicate_of, chunk))
+                    continue
+            unique.append(chunk)
+            
+            self.total_requirements += 1
+            self.total_confidence += chunk.confidence
+            self.glossary_index.add(chunk.id, chunk.text)
+            if self.near_duplicate_index is not None and error is None:
+                self.near_duplicate_index.add(chunk.id, chunk.confidence, chunk.text)
+            
+            # Add warnings for low confidence requirements
+            if chunk.confidence < 0.5:
+                self.processing_log["warnings"].append(f"Low confidence requirement {chunk.id} ({chunk.confidence:.2f})")
+        
+        self.processing_log["input_files"].append(file_info)
+        return unique
+    
+    def _assign_id(self, chunk: RequirementChunk) -> Optional[str]:
+        """Set chunk.id from its content; returns the ID it duplicates when deduplicating"""
+        digest = content_digest(chunk.text)
+        seen = self._ids_by_digest.get(digest)
+        if seen is not None:
+            if self.dedupe:
+                return seen[0]
+            seen[1] += 1
+            chunk.id = f"{seen[0]}-{seen[1]}"
+            return None
+        
+        for length in CONTENT_ID_LENGTHS:
+            chunk.id = content_id(digest, length)
+            if chunk.id not in self._used_ids:
+                break
+        self._used_ids.add(chunk.id)
+        self._ids_by_digest[digest] = [chunk.id, 1]
+        return None
+    
+    def apply_sources(self, chunks: List[RequirementChunk]) -> None:
+        """Attach the locations of merged duplicates to their first occurrences"""
+        for chunk in chunks:
+            duplicates = self.duplicate_sources.get(chunk.id)
+            chunk.sources = [chunk.location()] + duplicates if duplicates else None
+    
+    def near_duplicate_clusters(self, chunks: Optional[List[RequirementChunk]] = None) -> List[Dict[str, Any]]:
+        """Near-duplicate clusters found so far; given the batch's chunks, also sets their cluster_id"""
+        if self.near_duplicate_index is None:
+            return []
+        clusters = self.near_duplicate_index.clusters()
+        if chunks is not None:
+            cluster_of = {member: cluster["cluster_id"] for cluster in clusters for member in cluster["member_ids"]}
+            for chunk in chunks:
+                chunk.cluster_id = cluster_of.get(chunk.id)
+        return clusters
+    
+    def discard_outputs(self) -> None:
+        """Remove the in-progress sidecar and report rows of a run that did not finish"""
+        if self.markdown is not None:
+            self.markdown.discard()
+        if self.sidecar_path is not None:
+            try:
+                self.sidecar_path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def glossary_suspects(self) -> List[str]:
+        """Unique glossary candidates across all files, in first-seen order"""
+        return list(self.glossary_terms)
+    
+    def finish(self) -> Dict[str, Any]:
+        """Stamp the end time and fill in processing_stats; returns the processing log"""
+        self.end_time = datetime.now()
+        processing_time = (self.end_time - self.start_time).total_seconds()
+        avg_confidence = self.total_confidence / self.total_requirements if self.total_requirements else 0
+        input_files = self.processing_log["input_files"]
+        
+        stats = {
+            "total_files": len(self.files),
+            "successful_files": sum(1 for f in input_files if f["processed_successfully"]),
+            "failed_files": len(self.processing_log["errors"]),
+            "cached_files": sum(1 for f in input_files if f.get("from_cache")),
+            "total_requirements": self.total_requirements,
+            "duplicates_merged": sum(len(locations) for locations in self.duplicate_sources.values()),
+            "avg_confidence": round(avg_confidence, 2),
+            "processing_time_seconds": round(processing_time, 2)
+        }
+        if self.near_duplicate_index is not None:
+            clusters = self.near_duplicate_index.clusters()
+            stats["near_duplicate_clusters"] = len(clusters)
+            stats["near_duplicates"] = sum(cluster["size"] - 1 for cluster in clusters)
+        self.processing_log["processing_stats"] = stats
+        return self.processing_log
+
+
+# Per-process ingestor used by parallel workers (set by _init_worker)
+_worker_ingestor = None
+
+
+def _init_worker(ingestor: "RequirementsIngestor") -> None:
+    """Process pool initializer: keep one ingestor per worker process"""
+    global _worker_ingestor
+    _worker_ingestor = ingestor
+    _worker_ingestor._in_worker = True  # Workers never start pools of their own
+    _worker_ingestor._profiler = None
+    if ingestor.profile:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _warm_up() -> None:
+    """Import every built-in format library now rather than on the first file that needs it"""
+    for name in ("pdfplumber", "PyPDF2", "docx", "email"):
+        _optional_module(name)
+
+
+def _init_warm_worker(ingestor: "RequirementsIngestor") -> None:
+    """Process pool initializer for long-lived pools: _init_worker plus format library imports"""
+    _init_worker(ingestor)
+    _warm_up()
+
+
+def _start_warm_pool(ingestor: "RequirementsIngestor") -> Any:
+    """Long-lived process pool of ingestor.jobs warmed workers, all started before it is returned"""
+    from concurrent.futures import ProcessPoolExecutor, wait
+    
+    worker_template = copy.copy(ingestor)
+    worker_template._executor = None
+    executor = ProcessPoolExecutor(max_workers=ingestor.jobs, initializer=_init_warm_worker, initargs=(worker_template,))
+    wait([executor.submit(_warm_up) for _ in range(ingestor.jobs)])
+    return executor
+
+
+def _ingest_in_worker(file_path: str) -> Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]:
+    """Process pool task: ingest a single file with the worker's ingestor"""
+    return _worker_ingestor._ingest_file(file_path)
+
+
+class _BufferStream(io.RawIOBase):
+    """Read-only, seekable file object over a buffer (mmap or bytes) without copying it"""
+    
+    def __init__(self, buffer: Any):
+        super().__init__()
+        self._view = memoryview(buffer)
+        self._pos = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readinto(self, b: Any) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+class SourceDocument:
+    """Input file read once and shared by hashing and parsing.
+    
+    Files are memory-mapped, so the SHA-256 digest and the format handlers
+    read the same pages without ever holding a second copy of the content.
+    In-memory content (e.g. already decoded bytes) can be wrapped directly.
+    """
+    
+    def __init__(self, path: str, data: Any = b"", on_disk: bool = False):
+        self.path = path
+        self._data = data
+        self.on_disk = on_disk  # Workers can reopen the content by path
+        self.meta: Dict[str, Any] = {}  # Handler diagnostics, merged into the file's processing_log entry
+        self._streams: List[_BufferStream] = []
+    
+    @classmethod
+    def open(cls, path: str) -> "SourceDocument":
+        """Memory-map a file (empty files fall back to an empty buffer).
+        
+        A Maildir directory is read message by message by its handler; its
+        content here is the list of its message keys, so the hash changes
+        when messages are delivered or removed but not when flags change.
+        """
+        if os.path.isdir(path):
+            if not _is_maildir(Path(path)):
+                raise IsADirectoryError(f"{path} is a directory but not a Maildir (no cur/ and new/)")
+            return cls(path, "\n".join(key for key, _ in _maildir_messages(Path(path))).encode('utf-8'), on_disk=True)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(path, on_disk=True)
+            return cls(path, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), on_disk=True)
+    
+    @property
+    def size(self) -> int:
+        return len(self._data)
+    
+    def sha256(self) -> str:
+        """Hex SHA-256 of the content, computed straight from the buffer"""
+        return hashlib.sha256(self._data).hexdigest()
+    
+    def stream(self) -> io.RawIOBase:
+        """Seekable binary file object over the content for parsers that want one"""
+        stream = _BufferStream(self._data)
+        self._streams.append(stream)
+        return stream
+    
+    def text(self, encoding: str = 'utf-8') -> str:
+        """Decode the content with universal newlines, like open(..., 'r')"""
+        content = str(self._data, encoding)
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+    
+    def close(self) -> None:
+        # Parsers may keep their stream open; release its view before unmapping
+        for stream in self._streams:
+            stream.close()
+        self._streams = []
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+    
+    def __enter__(self) -> "SourceDocument":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_worker_pdf_source: Any = None
+
+
+def _init_pdf_worker(pdf_source: Any) -> None:
+    """Process pool initializer: the PDF (path or raw bytes) reaches each worker once, not with every task"""
+    global _worker_pdf_source
+    _worker_pdf_source = pdf_source
+
+
+def _extract_pdf_pages(page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Process pool task: extract text for a range of pages of the worker's PDF"""
+    import pdfplumber
+    
+    pdf_source = _worker_pdf_source
+    if isinstance(pdf_source, bytes):
+        pdf_source = io.BytesIO(pdf_source)
+    with pdfplumber.open(pdf_source) as pdf:
+        return [(page_num, pdf.pages[page_num - 1].extract_text() or "") for page_num in page_numbers]
+
+
+def _pdf_object_digest(obj: Any, memo: Dict[int, bytes], active: Optional[set] = None) -> bytes:
+    """Digest of a PDF object and everything it references (streams by raw data).
+    
+    Indirect objects are digested once per document through `memo`; a
+    reference back into an object still being digested hashes as its ID.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+    from pdfminer.psparser import PSLiteral, PSKeyword
+    
+    active = set() if active is None else active
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in memo:
+            return memo[obj.objid]
+        if obj.objid in active:
+            return b"ref:%d" % obj.objid
+        active.add(obj.objid)
+        try:
+            memo[obj.objid] = _pdf_object_digest(obj.resolve(), memo, active)
+        finally:
+            active.discard(obj.objid)
+        return memo[obj.objid]
+    
+    digest = hashlib.sha256()
+    if isinstance(obj, PDFStream):
+        digest.update(b"stream" + _pdf_object_digest(obj.attrs, memo, active))
+        digest.update(obj.get_rawdata() or b"")
+    elif isinstance(obj, dict):
+        digest.update(b"dict")
+        for key in sorted(obj, key=str):
+            digest.update(f"|{key}=".encode('utf-8') + _pdf_object_digest(obj[key], memo, active))
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"list")
+        for item in obj:
+            digest.update(_pdf_object_digest(item, memo, active))
+    elif isinstance(obj, (PSLiteral, PSKeyword)):
+        digest.update(f"name:{obj.name!r}".encode('utf-8'))
+    else:
+        digest.update(f"{type(obj).__name__}:{obj!r}".encode('utf-8'))
+    return digest.digest()
+
+
+def _is_maildir(path: Path) -> bool:
+    return (path / "cur").is_dir() and (path / "new").is_dir()
+
+
+def _maildir_messages(path: Path) -> List[Tuple[str, Path]]:
+    """(key, path) of every delivered message in a Maildir (new/ and cur/), ordered by key.
+    
+    The key is the file name without the ":2,<flags>" info suffix, which
+    changes when a client marks the message read.
+    """
+    messages = []
+    for subdirectory in ("new", "cur"):
+        with os.scandir(path / subdirectory) as entries:
+            for entry in entries:
+                if not entry.name.startswith('.') and entry.is_file():
+                    messages.append((entry.name.split(':', 1)[0], Path(entry.path)))
+    messages.sort()
+    return messages
+
+
+def _maildir_stat(path: Path) -> Tuple[int, int]:
+    """(latest mtime_ns of new/ and cur/, message count); changes whenever a message is delivered, moved or removed"""
+    mtime = max((path / subdirectory).stat().st_mtime_ns for subdirectory in ("new", "cur"))
+    return mtime, len(_maildir_messages(path))
+
+
+def _unique_suffix() -> str:
+    """Per-writer token for temporary files, unique across processes and threads"""
+    return f"{os.getpid()}-{os.urandom(4).hex()}"
+
+
+@contextmanager
+def project_lock(analysis_dir: Path, shared: bool = False, timeout: Optional[float] = None) -> Iterator[None]:
+    """Advisory lock on a project's Analysis folder (through Analysis/.lock).
+    
+    Writers publish under the exclusive lock; readers that need a consistent
+    set of outputs can take it shared (POSIX only; on Windows every lock is
+    exclusive). With a timeout, raises TimeoutError if the lock is not
+    acquired within that many seconds.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    lock_file = open(Path(analysis_dir) / ".lock", 'a+b')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            
+            def acquire() -> bool:
+                lock_file.seek(0)
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    return False
+            
+            def release() -> None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            
+            def acquire() -> bool:
+                if deadline is None:
+                    fcntl.flock(lock_file.fileno(), mode)
+                    return True
+                try:
+                    fcntl.flock(lock_file.fileno(), mode | fcntl.LOCK_NB)
+                    return True
+                except BlockingIOError:
+                    return False
+            
+            def release() -> None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        
+        while not acquire():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for the lock on {analysis_dir}")
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            release()
+    finally:
+        lock_file.close()
+
+
+class OutputBatch:
+    """Output files of one run, staged beside their targets and published together.
+    
+    stage(target) returns a temporary path next to target to write instead;
+    add() adopts a file already written in the same folder (the JSONL
+    sidecar) and remove() schedules a stale output for deletion. publish()
+    takes the project lock, runs the before callback (the version store
+    commit) and renames every staged file over its target, so readers never
+    see a half-written file and concurrent runs on one project publish whole
+    sets one after the other. Only publishing is serialized; parsing is not.
+    """
+    
+    def __init__(self, analysis_dir: Path, lock_timeout: Optional[float] = None):
+        self.analysis_dir = Path(analysis_dir)
+        self.lock_timeout = lock_timeout
+        self._staged: List[Tuple[Path, Path]] = []  # (temporary file, target)
+        self._removed: List[Path] = []
+    
+    def stage(self, target: Path) -> Path:
+        """Temporary path to write target's new content to"""
+        target = Path(target)
+        temp = target.with_name(f".{target.name}.{_unique_suffix()}.tmp")
+        self._staged.append((temp, target))
+        return temp
+    
+    def add(self, path: Path, target: Path) -> None:
+        """Publish an already written file as target"""
+        self._staged.append((Path(path), Path(target)))
+    
+    def remove(self, target: Path) -> None:
+        """Delete target when publishing"""
+        self._removed.append(Path(target))
+    
+    def publish(self, before: Optional[Callable[[], Any]] = None) -> Any:
+        """Atomically replace every target under the project lock; returns what before() returned"""
+        try:
+            with project_lock(self.analysis_dir, timeout=self.lock_timeout):
+                result = before() if before is not None else None
+                for temp, target in self._staged:
+                    os.replace(temp, target)
+                for target in self._removed:
+                    try:
+                        target.unlink()
+                    except FileNotFoundError:
+                        pass
+            self._staged = []
+            return result
+        finally:
+            self.discard()
+    
+    def discard(self) -> None:
+        """Delete staged files that were not published"""
+        for temp, _ in self._staged:
+            try:
+                temp.unlink()
+            except FileNotFoundError:
+                pass
+        self._staged = []
+        self._removed = []
+
+
+class MarkdownReportWriter:
+    """Streams the requirements.md report to disk.
+    
+    Table rows are rendered from each chunk as it is added and appended to a
+    temporary rows file beside the report, so the report never exists as one
+    string in memory. finish() writes the header (which needs the final
+    totals), copies the rows after it and appends the glossary and summary.
+    With page_size > 0 and more rows than that, the rows are split across
+    requirements-p001.md, requirements-p002.md, ... and requirements.md
+    becomes an index page linking to them.
+    """
+    
+    TABLE_HEADER = "\n\n| ID | Section | Text | Tags | Confidence |\n|----|---------|------|------|-----------|"
+    
+    def __init__(self, path: Path, page_size: int = 0):
+        self.path = Path(path)
+        self.page_size = max(0, page_size)
+        self.total = 0
+        self._pages: List[List[Any]] = []  # [rows file, row count, first ID, last ID]
+        self._rows: Optional[io.TextIOBase] = None
+    
+    @staticmethod
+    def row(chunk_id: str, location_hint: str, text: str, tags: Any, confidence: float) -> str:
+        """One table row: text flattened and cut to 80 characters, confidence as high/medium/low"""
+        clean_text = text.replace("\n", " ").replace("|", "\\|")
+        if len(clean_text) > 80:
+            clean_text = clean_text[:77] + "..."
+        section = location_hint.replace("|", "\\|")
+        if confidence >= 0.8:
+            conf_text = "high"
+        elif confidence >= 0.6:
+            conf_text = "medium"
+        else:
+            conf_text = "low"
+        return f"| {chunk_id} | {section} | {clean_text} | {', '.join(tags)} | {conf_text} |"
+    
+    def add(self, chunk: RequirementChunk) -> None:
+        """Append the row for one chunk"""
+        self._write_row(chunk.id, self.row(chunk.id, chunk.location_hint, chunk.text, chunk.tags, chunk.confidence))
+    
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Append the row for one output record (a RequirementChunk.to_dict() dict)"""
+        self._write_row(record["id"], self.row(record["id"], record.get("location_hint", "Unknown"), record["text"],
+                                               record["tags"], record["confidence"]))
+    
+    def page_path(self, number: int) -> Path:
+        """Path of report page number (1-based)"""
+        return self.path.with_name(f"{self.path.stem}-p{number:03d}{self.path.suffix}")
+    
+    def _write_row(self, chunk_id: str, row: str) -> None:
+        if self._rows is None or (self.page_size and self._pages[-1][1] >= self.page_size):
+            if self._rows is not None:
+                self._rows.close()
+            rows_path = self.path.with_name(f".{self.path.name}.rows-{len(self._pages) + 1:03d}.{_unique_suffix()}.tmp")
+            self._rows = open(rows_path, 'w', encoding='utf-8')
+            self._pages.append([rows_path, 0, chunk_id, chunk_id])
+        page = self._pages[-1]
+        self._rows.write("\n" + row)
+        page[1] += 1
+        page[3] = chunk_id
+        self.total += 1
+    
+    def finish(self, project_id: str, source_files: List[str], generated_at: str, glossary_suspects: List[str],
+               summary: Optional[Dict[str, Any]] = None, batch: Optional[OutputBatch] = None) -> List[Path]:
+        """Write the report (and its pages); returns the files written, report first.
+        
+        With a batch, the files are staged in it (and stale pages of an
+        earlier report scheduled for removal) instead of written in place.
+        """
+        if self._rows is not None:
+            self._rows.close()
+            self._rows = None
+        page_count = len(self._pages) if len(self._pages) > 1 else 0
+        for stale in self.path.parent.glob(f"{self.path.stem}-p[0-9][0-9][0-9]{self.path.suffix}"):
+            if int(stale.stem[-3:]) > page_count:
+                if batch is not None:
+                    batch.remove(stale)
+                else:
+                    stale.unlink()
+        
+        def output(target: Path) -> Path:
+            return batch.stage(target) if batch is not None else target
+        
+        header = (f"# Requirements Analysis Report\n\n**Project**: {project_id}\n"
+                  f"**Source**: {', '.join([Path(f).name for f in source_files])}\n"
+                  f"**Generated**: {generated_at}\n**Total Requirements**: {self.total}\n\n")
+        
+        tail = []
+        if glossary_suspects:
+            tail.extend(["", "## Glossary Suspects", ""])
+            tail.extend(f"- {term}" for term in sorted(glossary_suspects))
+        if summary is not None:
+            tail.extend([
+                "",
+                "## Processing Summary",
+                "",
+                f"- **Files processed**: {summary.get('total_files', 'Unknown')}",
+                f"- **Requirements extracted**: {summary.get('total_requirements', 'Unknown')}",
+                f"- **Average confidence**: {summary.get('avg_confidence', 'Unknown')}",
+                f"- **Processing time**: {summary.get('processing_time_seconds', 'Unknown')}s"
+            ])
+        tail = "\n" + "\n".join(tail) if tail else ""
+        
+        written = [self.path]
+        try:
+            with open(output(self.path), 'w', encoding='utf-8') as report:
+                if len(self._pages) <= 1:
+                    report.write(header + "## Requirements" + self.TABLE_HEADER)
+                    for rows_path, *_ in self._pages:
+                        self._copy_rows(rows_path, report)
+                else:
+                    report.write(header + "## Pages\n\n| Page | Requirements | First ID | Last ID |\n|------|--------------|----------|---------|")
+                    for number, (rows_path, count, first_id, last_id) in enumerate(self._pages, 1):
+                        page_path = self.page_path(number)
+                        report.write(f"\n| [Page {number}]({page_path.name}) | {count} | {first_id} | {last_id} |")
+                        with open(output(page_path), 'w', encoding='utf-8') as page:
+                            page.write(f"# Requirements Analysis Report - Page {number} of {len(self._pages)}\n\n"
+                                       f"**Project**: {project_id}\n**Index**: [{self.path.name}]({self.path.name})\n\n"
+                                       f"## Requirements" + self.TABLE_HEADER)
+                            self._copy_rows(rows_path, page)
+                        written.append(page_path)
+                report.write(tail)
+        finally:
+            self.discard()
+        return written
+    
+    @staticmethod
+    def _copy_rows(rows_path: Path, out: Any) -> None:
+        with open(rows_path, 'r', encoding='utf-8') as rows:
+            shutil.copyfileobj(rows, out)
+    
+    def discard(self) -> None:
+        """Remove the temporary rows files (after finish() or an aborted run)"""
+        if self._rows is not None:
+            self._rows.close()
+            self._rows = None
+        for rows_path, *_ in self._pages:
+            try:
+                os.unlink(rows_path)
+            except FileNotFoundError:
+                pass
+        self._pages = []
+
+
+class VersionStore:
+    """Content-addressed history of requirements.json under Analysis/versions/.
+    
+    Each requirement record is stored once, keyed by the BLAKE2b digest of
+    its encoded JSON, in the pack of the version that first produced it
+    (packs/v0003.jsonl); objects.idx maps every key to its pack, offset and
+    length. A version is a manifest (manifests/v0003.json) holding the
+    document's other fields and the pack location of each of its records in
+    order, so a new version writes only the records no earlier version had,
+    and reading one touches only its manifest and its own records.
+    """
+    
+    FORMAT = 1
+    
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifests_dir = self.root / "manifests"
+        self.packs_dir = self.root / "packs"
+        self.index_file = self.root / "objects.idx"
+    
+    def versions(self) -> List[int]:
+        """Committed version numbers, oldest first"""
+        if not self.manifests_dir.exists():
+            return []
+        # An empty manifest is a version number claimed by a commit still in progress
+        return sorted(int(path.stem[1:]) for path in self.manifests_dir.glob("v[0-9]*.json") if path.stat().st_size)
+    
+    def _pack_path(self, version: int) -> Path:
+        """Pack holding the records first stored by version"""
+        return self.packs_dir / f"v{version:04d}.jsonl"
+    
+    def _load_index(self) -> Dict[str, Tuple[int, int, int]]:
+        """Record key -> (pack version, offset, length) for every stored record"""
+        index = {}
+        if self.index_file.exists():
+            with open(self.index_file, 'r', encoding='ascii') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) == 4:  # Skips a line cut short by an interrupted commit
+                        index[fields[0]] = (int(fields[1]), int(fields[2]), int(fields[3]))
+        return index
+    
+    def commit(self, document: Dict[str, Any], records: Iterable[bytes]) -> int:
+        """Store a version of document whose "requirements" are the encoded records; returns its number.
+        
+        The version number is claimed by creating its manifest exclusively,
+        so concurrent commits never overwrite each other; the manifest content
+        is then swapped in atomically once every record is stored.
+        """
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.packs_dir.mkdir(exist_ok=True)
+        index = self._load_index()
+        
+        version = max((int(path.stem[1:]) for path in self.manifests_dir.glob("v[0-9]*.json")), default=0) + 1
+        while True:
+            try:
+                manifest_file = self.manifests_dir / f"v{version:04d}.json"
+                open(manifest_file, 'xb').close()
+                break
+            except FileExistsError:
+                version += 1
+        
+        locations = []
+        new_keys = []
+        pack = None
+        try:
+            for record in records:
+                key = hashlib.blake2b(record, digest_size=16).hexdigest()
+                location = index.get(key)
+                if location is None:
+                    if pack is None:
+                        pack = open(self._pack_path(version), 'wb')
+                    location = index[key] = (version, pack.tell(), len(record))
+                    pack.write(record + b"\n")
+                    new_keys.append(key)
+                locations.append(location)
+        finally:
+            if pack is not None:
+                pack.close()
+        
+        if new_keys:
+            with open(self.index_file, 'a', encoding='ascii') as f:
+                f.write("".join(f"{key} {index[key][0]} {index[key][1]} {index[key][2]}\n" for key in new_keys))
+        
+        temp_file = manifest_file.with_name(f".{manifest_file.name}.{_unique_suffix()}.tmp")
+        with open(temp_file, 'wb') as manifest:
+            manifest.write(json.dumps({
+                "format": self.FORMAT,
+                "version": version,
+                "created_at": datetime.now().isoformat(),
+                "new_records": len(new_keys),
+                "document": dict(document, requirements=None),
+                "records": locations
+            }, ensure_ascii=False, separators=_COMPACT_SEPARATORS).encode('utf-8'))
+        os.replace(temp_file, manifest_file)
+        return version
+    
+    def load(self, version: Optional[int] = None) -> Dict[str, Any]:
+        """The requirements.json document of a version (the latest by default)"""
+        if version is None:
+            versions = self.versions()
+            if not versions:
+                raise FileNotFoundError(f"No versions stored in {self.root}")
+            version = versions[-1]
+        with open(self.manifests_dir / f"v{version:04d}.json", 'rb') as f:
+            manifest = json.load(f)
+        
+        packs: Dict[int, Any] = {}
+        requirements = []
+        try:
+            for pack_version, offset, length in manifest["records"]:
+                pack = packs.get(pack_version)
+                if pack is None:
+                    pack = packs[pack_version] = open(self._pack_path(pack_version), 'rb')
+                pack.seek(offset)
+                requirements.append(json.loads(pack.read(length)))
+        finally:
+            for pack in packs.values():
+                pack.close()
+        
+        document = manifest["document"]
+        document["requirements"] = requirements
+        return document
+
+
 class RequirementsIngestor:
     """Main class for requirements ingestion and processing"""
     
-    def __init__(self, output_base_dir: str = "./outputs"):
-        """Initialize with configurable output directory"""
+    CHUNK_UNITS = ('words', 'chars', 'tokens')
+    
+    def __init__(self, output_base_dir: str = "./outputs", jobs: int = 1, incremental: bool = False,
+                 chunk_size: int = 300, chunk_unit: str = 'words', chunk_overlap: int = 0,
+                 pdf_extraction: str = 'tiered', profile: bool = False, spans: bool = False, dedupe: bool = True,
+                 near_duplicates: bool = False, near_duplicate_threshold: float = 0.7, pretty: bool = False,
+                 json_backend: str = 'auto', markdown_page_size: int = 0, versioning: bool = True,
+                 lock_timeout: Optional[float] = None, cache_dir: Optional[str] = None):
+        """Initialize with configurable output directory and worker count (jobs <= 0 uses all CPUs).
+        
+        With incremental=True, parsed chunks are cached per project under
+        Analysis/cache/ and reused for files whose content hash is unchanged;
+        cache_dir puts one cache shared by every project there instead.
+        chunk_size/chunk_unit bound each text chunk in words, characters or
+        approximate tokens; chunk_overlap repeats that many trailing sentences
+        at the start of the next chunk. pdf_extraction='tiered' reads each PDF
+        page's text layer with PyPDF2 first and only falls back to pdfplumber's
+        layout analysis for pages that need it; 'layout' always uses pdfplumber.
+        profile=True records time and tracemalloc peak per file and per stage
+        into processing_log.json (tracemalloc slows processing down noticeably).
+        spans=True makes split chunks reference (buffer, start, end) spans of
+        the loaded text instead of holding their own copy, and adds the exact
+        character offsets to each output record as "span".
+        Requirement IDs are derived from the normalized text, so they are
+        stable across runs; with dedupe=True, requirements repeated within or
+        across files collapse into one whose "sources" lists every location.
+        near_duplicates=True additionally clusters reworded copies (MinHash
+        estimated Jaccard similarity of word bigrams >= near_duplicate_threshold)
+        and records each cluster and its canonical requirement in the output.
+        JSON outputs are written compact by json_backend ('auto' picks orjson
+        when installed, else the stdlib); pretty=True indents them.
+        requirements.md is streamed row by row; with markdown_page_size > 0 a
+        larger report is split into pages of that many rows behind an index.
+        versioning=True commits every saved run to the project's VersionStore
+        (Analysis/versions/); load_version() reads any of them back.
+        Outputs are staged in temporary files and published together under an
+        advisory per-project lock, waiting at most lock_timeout seconds for it
+        (forever when None), so concurrent runs on one project are safe.
+        """
+        if chunk_unit not in self.CHUNK_UNITS:
+            raise ValueError(f"chunk_unit must be one of {', '.join(self.CHUNK_UNITS)}: {chunk_unit!r}")
+        if pdf_extraction not in PDF_EXTRACTION_MODES:
+            raise ValueError(f"pdf_extraction must be one of {', '.join(PDF_EXTRACTION_MODES)}: {pdf_extraction!r}")
+        
         self.output_base_dir = Path(output_base_dir)
+        self.chunk_size = chunk_size
+        self.chunk_unit = chunk_unit
+        self.chunk_overlap = max(0, chunk_overlap)
+        self.pdf_extraction = pdf_extraction
+        self.spans = spans
+        self.dedupe = dedupe
+        self.near_duplicates = near_duplicates
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.serializer = JsonSerializer(json_backend, pretty)
+        self.markdown_page_size = markdown_page_size
+        self.versioning = versioning
+        self.lock_timeout = lock_timeout
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self._in_worker = False
+        self.incremental = incremental
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._cache_dir: Optional[Path] = None
+        self._cache_config = ""
+        self.profile = profile
+        self._profiler: Optional[StageProfiler] = None
+        self.last_profile: Optional[Dict[str, Any]] = None
         self.classification_keywords = {
             'functional': [
                 'shall', 'must', 'will', 'should', 'function', 'feature', 
@@ -71,333 +1563,1043 @@ class RequirementsIngestor:
                 'phase 2', 'beyond', 'outside'
             ]
         }
+        self.requirement_indicators = [
+            'shall', 'must', 'will', 'should', 'requires', 'needs',
+            'system', 'user', 'application', 'feature', 'function'
+        ]
+        self.confidence_keywords = {
+            'strong': ['shall', 'must', 'will'],
+            'vague': ['maybe', 'probably', 'might', 'unclear']
+        }
+        self._matcher: Optional[KeywordMatcher] = None
+        self._executor: Any = None  # Long-lived worker pool to parse in (IngestServer); None starts one per batch
+        self.last_output_paths: Optional[Dict[str, str]] = None
     
     def process_files(self, files: List[str], project_id: str, save_to_file: bool = True) -> Dict[str, Any]:
         """Main entry point for processing multiple files"""
-        start_time = datetime.now()
-        all_requirements = []
-        all_glossary_terms = []
-        processing_log = {
-            "project_id": project_id,
-            "processing_session": {
-                "timestamp": start_time.isoformat(),
-                "version": "1.0",
-                "tool_version": "requirements-ingest-v2.1",
-                "user": os.environ.get("USERNAME", "unknown"),
-                "method": "traditional_script"
-            },
-            "input_files": [],
-            "processing_stats": {},
-            "errors": [],
-            "warnings": []
-        }
+        return self.process_results(files, project_id, None, save_to_file)
+    
+    def process_results(self, files: List[str], project_id: str,
+                        results: Optional[Iterable[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]],
+                        save_to_file: bool = True) -> Dict[str, Any]:
+        """process_files over per-file results that were already ingested (one per file, in files order).
         
-        for file_path in files:
-            file_info = {
-                "file_path": file_path,
-                "file_size": 0,
-                "file_hash": "",
-                "processed_successfully": False,
-                "requirements_extracted": 0
+        Lets a caller that keeps results between runs (ProjectWatcher) rebuild
+        the outputs after re-ingesting only some files; None ingests files.
+        """
+        session = self._new_session(project_id, files)
+        with self._profiling():
+            analysis_dir = self._create_project_directory(project_id) if save_to_file else None
+            if analysis_dir is not None:
+                session.markdown = MarkdownReportWriter(analysis_dir / "requirements.md", self.markdown_page_size)
+            
+            try:
+                all_requirements = list(self._run_session(session, files, analysis_dir, results))
+            except BaseException:
+                session.discard_outputs()
+                raise
+            session.apply_sources(all_requirements)
+            near_duplicate_clusters = session.near_duplicate_clusters(all_requirements)
+            processing_log = session.finish()
+            unique_glossary = session.glossary_suspects()
+            
+            # Prepare main output
+            requirements_output = {
+                "project_id": project_id,
+                "generated_at": session.end_time.isoformat(),
+                "version": "1.0",
+                "total_requirements": len(all_requirements),
+                "requirements": [self._chunk_to_dict(chunk) for chunk in all_requirements],
+                "glossary_suspects": unique_glossary,
+                "processing_summary": processing_log["processing_stats"]
             }
+            if self.near_duplicates:
+                requirements_output["near_duplicate_clusters"] = near_duplicate_clusters
+            
+            # Prepare glossary output
+            with self._stage("glossary"):
+                glossary_output = self._glossary_from_index(project_id, unique_glossary, session.glossary_index,
+                                                            lambda i: all_requirements[i].text)
+            
+            if self._profiler is not None:
+                processing_log["profile"] = self.last_profile = self._profile_summary(processing_log)
+            
+            # Save to files if requested
+            if save_to_file:
+                batch = OutputBatch(analysis_dir, self.lock_timeout)
+                batch.add(session.sidecar_path, analysis_dir / "requirements.jsonl")
+                output_paths = self.last_output_paths = self._save_outputs(
+                    project_id, requirements_output, processing_log, glossary_output, files,
+                    chunks=all_requirements, markdown=session.markdown, batch=batch)
+                print(f"✅ Requirements processed and saved to: {output_paths['base_dir']}")
+                print(f"   📋 Requirements (JSON): {output_paths['requirements_json']}")
+                print(f"   📄 Requirements (MD): {output_paths['requirements_md']}")
+                print(f"   📊 Processing Log: {output_paths['log']}")
+                print(f"   📚 Glossary: {output_paths['glossary']}")
+                if "version" in output_paths:
+                    print(f"   🗂️ Version: {output_paths['version']}")
             
+            return requirements_output
+    
+    def iter_requirements(self, files: List[str], project_id: str, save_to_file: bool = True) -> Iterator[RequirementChunk]:
+        """Streaming entry point: yield chunks as soon as each file is parsed.
+        
+        With save_to_file, every chunk is appended to the JSONL sidecar as it is
+        yielded, so consumers can tail it while the batch runs (it is named
+        Analysis/requirements.jsonl.<run>.partial until the batch is published
+        as requirements.jsonl). Summary stats and glossary counts are aggregated
+        on the fly; once the iterator is exhausted, processing_log.json,
+        glossary.json and the source mapping are written. Chunk bodies are not
+        retained, but per-chunk index state (glossary postings, sidecar
+        offsets, ID and digest maps) still grows linearly with the number of
+        chunks. The Markdown report is streamed too: its rows are written as
+        chunks are yielded and the report is assembled at the end.
+        requirements.json is produced by process_files.
+        
+        Duplicates of an already yielded requirement are not yielded again;
+        the sidecar records each one as a {"duplicate_of": ID, ...location} line.
+        Near-duplicate clusters are only known once the batch is done, so they
+        go to processing_log.json instead of the yielded chunks.
+        """
+        session = self._new_session(project_id, files)
+        with self._profiling():
+            if not save_to_file:
+                yield from self._run_session(session, files, None)
+                processing_log = session.finish()
+                if self._profiler is not None:
+                    self.last_profile = self._profile_summary(processing_log)
+                return
+            
+            analysis_dir = self._create_project_directory(project_id)
+            session.markdown = MarkdownReportWriter(analysis_dir / "requirements.md", self.markdown_page_size)
             try:
-                # Get file info
-                if os.path.exists(file_path):
-                    file_info["file_size"] = os.path.getsize(file_path)
-                    file_info["file_hash"] = self._calculate_file_hash(file_path)
-                
-                chunks = self._process_single_file(file_path)
-                all_requirements.extend(chunks)
-                file_info["processed_successfully"] = True
-                file_info["requirements_extracted"] = len(chunks)
-                
-                # Extract glossary candidates
-                text_content = ' '.join([chunk.text for chunk in chunks])
-                glossary_terms = self._extract_glossary_suspects(text_content)
-                all_glossary_terms.extend(glossary_terms)
+                yield from self._run_session(session, files, analysis_dir)
+            except BaseException:  # Including GeneratorExit when the consumer stops early
+                session.discard_outputs()
+                raise
+            self._publish_stream(session, files, analysis_dir)
+    
+    def _publish_stream(self, session: "_IngestSession", files: List[str], analysis_dir: Path) -> None:
+        """Write the remaining outputs of a finished streaming batch and publish them with its sidecar"""
+        project_id = session.project_id
+        processing_log = session.finish()
+        if self.near_duplicates:
+            processing_log["near_duplicate_clusters"] = session.near_duplicate_clusters()
+        
+        batch = OutputBatch(analysis_dir, self.lock_timeout)
+        batch.add(session.sidecar_path, analysis_dir / "requirements.jsonl")
+        try:
+            # Glossary contexts are read back from the sidecar by byte offset
+            with self._stage("glossary"), open(session.sidecar_path, 'rb') as sidecar:
+                def text_of(chunk_index: int) -> str:
+                    sidecar.seek(session.sidecar_offsets[chunk_index])
+                    return json.loads(sidecar.readline())["text"]
                 
-            except Exception as e:
-                # Add error chunk for problematic files
-                error_chunk = RequirementChunk(
-                    id=f"R-ERROR-{len(all_requirements) + 1:03d}",
-                    source_file=file_path,
-                    location_hint="file processing error",
-                    text=f"Error processing file: {str(e)}",
-                    tags=["assumption"],
-                    confidence=0.1
-                )
-                all_requirements.append(error_chunk)
-                processing_log["errors"].append(f"Failed to process {file_path}: {str(e)}")
-                file_info["requirements_extracted"] = 1  # Error chunk
+                glossary_output = self._glossary_from_index(project_id, session.glossary_suspects(),
+                                                            session.glossary_index, text_of)
+            
+            with self._stage("serialize"):
+                self.serializer.dump(glossary_output, batch.stage(analysis_dir / "glossary.json"))
+                self._create_source_mapping(analysis_dir, processing_log["input_files"], batch)
+                session.markdown.finish(project_id, files, session.end_time.isoformat(), session.glossary_suspects(),
+                                        processing_log["processing_stats"], batch)
+            
+            # The log goes last so that it can carry the complete profile
+            if self._profiler is not None:
+                processing_log["profile"] = self.last_profile = self._profile_summary(processing_log)
+            self.serializer.dump(processing_log, batch.stage(analysis_dir / "processing_log.json"))
             
-            processing_log["input_files"].append(file_info)
+            def commit_version() -> int:
+                document = {
+                    "project_id": project_id,
+                    "generated_at": session.end_time.isoformat(),
+                    "version": "1.0",
+                    "total_requirements": session.total_requirements,
+                    "requirements": None,
+                    "glossary_suspects": session.glossary_suspects(),
+                    "processing_summary": processing_log["processing_stats"]
+                }
+                with open(session.sidecar_path, 'rb') as sidecar:
+                    records = (line.rstrip(b"\n") for line in sidecar if not line.startswith(b'{"duplicate_of"'))
+                    return VersionStore(analysis_dir / "versions").commit(document, records)
+            
+            batch.publish(commit_version if self.versioning else None)
+        except BaseException:
+            batch.discard()
+            session.markdown.discard()
+            raise
+    
+    async def aprocess_files(self, files: List[str], project_id: str, save_to_file: bool = True,
+                             file_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """asyncio counterpart of process_files (see aiter_requirements for how files are read and parsed)"""
+        import asyncio
+        
+        ingestor = self._async_copy()
+        await asyncio.to_thread(ingestor._prepare_run, project_id)
+        results = [result async for result in ingestor._aiter_file_results(files, file_timeout)]
+        output = await asyncio.to_thread(ingestor.process_results, files, project_id, results, save_to_file)
+        self.last_output_paths, self.last_profile = ingestor.last_output_paths, ingestor.last_profile
+        return output
+    
+    async def aiter_requirements(self, files: List[str], project_id: str, save_to_file: bool = True,
+                                 file_timeout: Optional[float] = None) -> AsyncIterator[RequirementChunk]:
+        """asyncio counterpart of iter_requirements, for embedding in async services.
+        
+        Files are read on a thread and parsed on the loop's default executor
+        (or, with jobs > 1, on a worker process pool), so the event loop stays
+        free and several batches can run concurrently in one loop; each batch
+        works on its own shallow copy of the ingestor. A file that takes
+        longer than file_timeout seconds is recorded as failed and the batch
+        moves on; its parse cannot be interrupted and finishes unused in the
+        background. Cancelling the consuming task, or closing the iterator
+        early (contextlib.aclosing), cancels the files in flight and discards
+        the partial outputs; once publishing has started it runs to completion.
+        """
+        import asyncio
+        
+        ingestor = self._async_copy()
+        session = ingestor._new_session(project_id, files)
+        with ingestor._profiling():
+            analysis_dir = None
+            if save_to_file:
+                analysis_dir = await asyncio.to_thread(ingestor._create_project_directory, project_id)
+                session.markdown = MarkdownReportWriter(analysis_dir / "requirements.md", ingestor.markdown_page_size)
+                session.sidecar_path = analysis_dir / f"requirements.jsonl.{_unique_suffix()}.partial"
+            await asyncio.to_thread(ingestor._prepare_run, project_id)
+            
+            try:
+                with open(session.sidecar_path, 'wb') if save_to_file else nullcontext() as sidecar:
+                    async for result in ingestor._aiter_file_results(files, file_timeout):
+                        for chunk in ingestor._add_file_result(session, result, sidecar):
+                            yield chunk
+            except BaseException:  # Including CancelledError and GeneratorExit
+                if save_to_file:
+                    session.discard_outputs()
+                raise
+            
+            if save_to_file:
+                await asyncio.to_thread(ingestor._publish_stream, session, files, analysis_dir)
+                self.last_profile = ingestor.last_profile
+            else:
+                processing_log = session.finish()
+                if ingestor._profiler is not None:
+                    self.last_profile = ingestor._profile_summary(processing_log)
+    
+    def _async_copy(self) -> "RequirementsIngestor":
+        """Shallow copy for one async batch: shares configuration, keeps per-batch parsing state separate"""
+        ingestor = copy.copy(self)
+        ingestor._profiler = None
+        return ingestor
+    
+    async def _aiter_file_results(self, files: List[str], file_timeout: Optional[float]
+                                  ) -> AsyncIterator[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]:
+        """Async _iter_file_results: per-file results in input order, file_timeout seconds per file"""
+        import asyncio
+        
+        workers = min(self.jobs, len(files))
+        executor = pool = None
+        if workers > 1:
+            executor = self._executor
+            if executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                executor = pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,))
+        
+        pending = deque()
+        remaining = iter(files)
+        try:
+            # As in _map_in_order, up to two files per worker are in flight; one at a time on threads
+            for file_path in remaining:
+                pending.append(asyncio.ensure_future(self._aingest_file(file_path, executor, file_timeout)))
+                if len(pending) >= (2 * workers if executor is not None else 1):
+                    break
+            while pending:
+                result = await pending[0]
+                pending.popleft()
+                next_file = next(remaining, None)
+                if next_file is not None:
+                    pending.append(asyncio.ensure_future(self._aingest_file(next_file, executor, file_timeout)))
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    async def _aingest_file(self, file_path: str, executor: Any, file_timeout: Optional[float]
+                            ) -> Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]:
+        """_ingest_file off the event loop: on executor (a process pool) or opened on a thread and parsed on another"""
+        import asyncio
         
-        # Remove duplicate glossary terms and filter
-        unique_glossary = list(set(all_glossary_terms))
+        loop = asyncio.get_running_loop()
+        
+        async def ingest() -> Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]:
+            if executor is not None:
+                # Workers map the file themselves instead of receiving its bytes
+                return await loop.run_in_executor(executor, _ingest_in_worker, file_path)
+            try:
+                # Same dispatch as the sync path, so Maildir directories and mailboxes open alike
+                source = await asyncio.to_thread(SourceDocument.open, file_path)
+            except OSError as e:
+                return self._new_file_info(file_path), [], [], str(e)
+            return await loop.run_in_executor(None, self._ingest_file, file_path, source)
+        
+        try:
+            return await asyncio.wait_for(ingest(), file_timeout)
+        except asyncio.TimeoutError:
+            return self._new_file_info(file_path), [], [], f"Timed out after {file_timeout}s"
+    
+    def _new_session(self, project_id: str, files: List[str]) -> "_IngestSession":
+        """Session for one batch, with a near-duplicate index when enabled"""
+        threshold = self.near_duplicate_threshold if self.near_duplicates else None
+        return _IngestSession(project_id, files, self.dedupe, threshold)
+    
+    def _run_session(self, session: "_IngestSession", files: List[str], analysis_dir: Optional[Path],
+                     results: Optional[Iterable[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]] = None
+                     ) -> Iterator[RequirementChunk]:
+        """Feed per-file results into the session, yielding chunks and appending them to the JSONL sidecar
+        (and their rows to the session's Markdown report, if any)"""
+        self._prepare_run(session.project_id)
+        if results is None:
+            results = self._iter_file_results(files)
+        
+        if analysis_dir is None:
+            for result in results:
+                yield from self._add_file_result(session, result, None)
+            return
+        
+        session.sidecar_path = analysis_dir / f"requirements.jsonl.{_unique_suffix()}.partial"
+        with open(session.sidecar_path, 'wb') as sidecar:
+            for result in results:
+                yield from self._add_file_result(session, result, sidecar)
+    
+    def _prepare_run(self, project_id: Optional[str] = None) -> None:
+        """Reset per-batch parsing state; must run before the batch's files are ingested
+        (project_id locates the per-project cache and is only needed without a cache_dir)"""
+        # Pick up any keyword table edits made since the last run
+        self._matcher = None
+        
+        if self.incremental:
+            cache_root = self.cache_dir if self.cache_dir is not None else self._create_project_directory(project_id) / "cache"
+            self._cache_dir = cache_root / "chunks"
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_config = self._config_fingerprint()
+        else:
+            self._cache_dir = None
+    
+    def _add_file_result(self, session: "_IngestSession",
+                         result: Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]],
+                         sidecar: Any) -> List[RequirementChunk]:
+        """Add one file's result to the session and its sidecar (None when not saving); returns the new chunks"""
+        with self._stage("glossary"):
+            chunks = session.add_file_result(*result)
+        if sidecar is None:
+            return chunks
+        
+        with self._stage("serialize"):
+            for chunk in chunks:
+                session.sidecar_offsets.append(sidecar.tell())
+                sidecar.write(chunk.to_json().encode('utf-8') + b"\n")
+                if session.markdown is not None:
+                    session.markdown.add(chunk)
+            for duplicate_of, duplicate in session.last_duplicates:
+                line = {"duplicate_of": duplicate_of, **duplicate.location()}
+                sidecar.write(self.serializer.dumps(line) + b"\n")
+            sidecar.flush()  # One file at a time becomes visible to readers
+        return chunks
+    
+    def _iter_file_results(self, files: List[str]) -> Iterator[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]:
+        """Yield per-file ingestion results in input order, in parallel when jobs > 1"""
+        workers = min(self.jobs, len(files))
+        if workers <= 1:
+            for file_path in files:
+                yield self._ingest_file(file_path)
+            return
+        
+        if self._executor is not None:
+            yield from self._map_in_order(self._executor, files, workers)
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # Workers receive one pickled copy of the ingestor at start-up
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            yield from self._map_in_order(executor, files, workers)
+    
+    @staticmethod
+    def _map_in_order(executor: Any, files: List[str], workers: int
+                      ) -> Iterator[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]:
+        """Ingest files on a worker pool, yielding results in submission order.
+        
+        Matching input order keeps output identical to the serial path; at most
+        two tasks per worker are in flight to keep finished results bounded.
+        """
+        pending = deque()
+        remaining = iter(files)
+        for file_path in remaining:
+            pending.append(executor.submit(_ingest_in_worker, file_path))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            next_file = next(remaining, None)
+            if next_file is not None:
+                pending.append(executor.submit(_ingest_in_worker, next_file))
+            yield result
+    
+    def _ingest_file(self, file_path: str, source: Optional[SourceDocument] = None
+                     ) -> Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]:
+        """Hash, parse and extract glossary candidates for one file; errors are returned, not raised.
+        
+        source is the file's content when the caller has already opened it
+        (aiter_requirements); otherwise the file is opened here.
+        """
+        file_info = self._new_file_info(file_path)
+        
+        # Each file gets its own stage profile, shipped back in file_info
+        batch_profiler = self._profiler
+        if self.profile:
+            self._profiler = StageProfiler()
+        started = time.perf_counter()
+        
+        try:
+            # One read serves the size, the hash and the parser
+            with self._stage("hash"):
+                if source is None:
+                    source = SourceDocument.open(file_path)
+                file_info["file_size"] = source.size
+                file_info["file_hash"] = source.sha256()[:16]  # First 16 chars
+            
+            with source:
+                cached = self._load_cached_chunks(file_path, file_info["file_hash"])
+                if cached is not None:
+                    chunks, glossary_terms = cached
+                    file_info["from_cache"] = True
+                else:
+                    with self._stage("parse"):
+                        chunks = self._process_single_file(source)
+                    file_info.update(source.meta)
+                    
+                    # Extract glossary candidates
+                    with self._stage("glossary"):
+                        text_content = ' '.join([chunk.text for chunk in chunks])
+                        glossary_terms = self._extract_glossary_suspects(text_content)
+                    self._store_cached_chunks(file_path, file_info["file_hash"], chunks, glossary_terms)
+            
+            file_info["processed_successfully"] = True
+            file_info["requirements_extracted"] = len(chunks)
+        except Exception as e:
+            return file_info, [], [], str(e)
+        finally:
+            if self.profile:
+                file_info["profile"] = {
+                    "seconds": round(time.perf_counter() - started, 6),
+                    "bytes_read": file_info["file_size"],
+                    "chunks_emitted": file_info["requirements_extracted"],
+                    "stages": self._profiler.as_dict()
+                }
+            self._profiler = batch_profiler
         
-        # Calculate processing stats
-        end_time = datetime.now()
-        processing_time = (end_time - start_time).total_seconds()
-        total_confidence = sum(chunk.confidence for chunk in all_requirements)
-        avg_confidence = total_confidence / len(all_requirements) if all_requirements else 0
+        return file_info, chunks, glossary_terms, None
+    
+    @staticmethod
+    def _new_file_info(file_path: str) -> Dict[str, Any]:
+        """processing_log entry for a file that has not been ingested (yet)"""
+        return {
+            "file_path": file_path,
+            "file_size": 0,
+            "file_hash": "",
+            "processed_successfully": False,
+            "requirements_extracted": 0
+        }
+    
+    @contextmanager
+    def _profiling(self) -> Iterator[None]:
+        """Collect batch-level stage stats (and trace memory) for one batch when profile=True"""
+        if not self.profile:
+            yield
+            return
+        
+        import tracemalloc
+        start_tracing = not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        self._profiler = StageProfiler()
+        try:
+            yield
+        finally:
+            self._profiler = None
+            if start_tracing:
+                tracemalloc.stop()
+    
+    def _stage(self, name: str):
+        """Context manager timing one pipeline stage while profiling; a no-op otherwise"""
+        return self._profiler.stage(name) if self._profiler is not None else nullcontext()
+    
+    def _profile_summary(self, log: Dict) -> Dict[str, Any]:
+        """Batch profile for processing_log.json: stage totals, batch-level stages and the slowest files"""
+        import tracemalloc
         
-        # Add warnings for low confidence requirements
-        for chunk in all_requirements:
-            if chunk.confidence < 0.5:
-                processing_log["warnings"].append(f"Low confidence requirement {chunk.id} ({chunk.confidence:.2f})")
+        profiled = [f for f in log["input_files"] if "profile" in f]
+        stages: Dict[str, Dict[str, float]] = {}
+        for file_info in profiled:
+            StageProfiler.merge(stages, file_info["profile"]["stages"])
+        StageProfiler.merge(stages, self._profiler.stages)
         
-        processing_log["processing_stats"] = {
-            "total_files": len(files),
-            "successful_files": sum(1 for f in processing_log["input_files"] if f["processed_successfully"]),
-            "failed_files": len(processing_log["errors"]),
-            "total_requirements": len(all_requirements),
-            "avg_confidence": round(avg_confidence, 2),
-            "processing_time_seconds": round(processing_time, 2)
+        slowest = sorted(profiled, key=lambda f: f["profile"]["seconds"], reverse=True)[:5]
+        return {
+            "memory_traced": tracemalloc.is_tracing(),
+            "bytes_read": sum(f["profile"]["bytes_read"] for f in profiled),
+            "chunks_emitted": sum(f["profile"]["chunks_emitted"] for f in profiled),
+            "stages": stages,
+            "batch_stages": self._profiler.as_dict(),
+            "slowest_files": [{
+                "file_path": f["file_path"],
+                "seconds": f["profile"]["seconds"],
+                "slowest_stage": max(f["profile"]["stages"], key=lambda n: f["profile"]["stages"][n]["seconds"], default=None)
+            } for f in slowest]
         }
-        
-        # Prepare main output
-        requirements_output = {
-            "project_id": project_id,
-            "generated_at": end_time.isoformat(),
-            "version": "1.0",
-            "total_requirements": len(all_requirements),
-            "requirements": [self._chunk_to_dict(chunk) for chunk in all_requirements],
-            "glossary_suspects": unique_glossary,
-            "processing_summary": processing_log["processing_stats"]
+    
+    def _config_fingerprint(self) -> str:
+        """Hash of every setting that changes parser output; part of each chunk cache key"""
+        config = {
+            "cache_format": CHUNK_CACHE_FORMAT,
+            "tool_version": TOOL_VERSION,
+            "classification_keywords": self.classification_keywords,
+            "requirement_indicators": self.requirement_indicators,
+            "confidence_keywords": self.confidence_keywords,
+            "chunking": [self.chunk_size, self.chunk_unit, self.chunk_overlap],
+            "pdf_extraction": self.pdf_extraction,
+            "spans": self.spans
         }
+        encoded = json.dumps(config, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+    
+    def _cache_path(self, file_hash: str) -> Optional[Path]:
+        """Chunk cache entry for a file hash, or None when caching does not apply"""
+        if self._cache_dir is None or not file_hash or file_hash == "unknown":
+            return None
+        return self._cache_dir / f"{file_hash}-{self._cache_config}.json"
+    
+    def _load_cached_chunks(self, file_path: str, file_hash: str) -> Optional[Tuple[List[RequirementChunk], List[str]]]:
+        """Return cached (chunks, glossary_terms) for an unchanged file, or None on a miss"""
+        cache_file = self._cache_path(file_hash)
+        if cache_file is None or not cache_file.exists():
+            return None
         
-        # Prepare glossary output
-        glossary_output = self._create_glossary_output(project_id, unique_glossary, all_requirements)
-        
-        # Save to files if requested
-        if save_to_file:
-            output_paths = self._save_outputs(project_id, requirements_output, processing_log, glossary_output, files)
-            print(f"✅ Requirements processed and saved to: {output_paths['base_dir']}")
-            print(f"   📋 Requirements (JSON): {output_paths['requirements_json']}")
-            print(f"   📄 Requirements (MD): {output_paths['requirements_md']}")
-            print(f"   📊 Processing Log: {output_paths['log']}")
-            print(f"   📚 Glossary: {output_paths['glossary']}")
-            
-        return requirements_output
-    
-    def _process_single_file(self, file_path: str) -> List[RequirementChunk]:
-        """Process a single file and extract requirements"""
-        file_ext = Path(file_path).suffix.lower()
-        
-        if file_ext == '.pdf':
-            return self._process_pdf(file_path)
-        elif file_ext in ['.docx', '.doc']:
-            return self._process_docx(file_path)
-        elif file_ext in ['.md', '.markdown']:
-            return self._process_markdown(file_path)
-        elif file_ext in ['.eml', '.email', '.txt']:
-            return self._process_email(file_path)
-        else:
-            # Fallback: treat as plain text
-            return self._process_text(file_path)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            chunks = [RequirementChunk(*fields) for fields in entry["chunks"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # Corrupt or outdated entry: re-parse
+        
+        # Same content may be cached under another name; keep the current one
+        file_name = Path(file_path).name
+        for chunk in chunks:
+            chunk.source_file = sys.intern(file_name)
+        
+        return chunks, entry["glossary_terms"]
+    
+    def _store_cached_chunks(self, file_path: str, file_hash: str, chunks: List[RequirementChunk], glossary_terms: List[str]) -> None:
+        """Write a chunk cache entry atomically (parallel workers may share the cache)"""
+        cache_file = self._cache_path(file_hash)
+        if cache_file is None:
+            return
+        
+        entry = {
+            "file_name": Path(file_path).name,
+            "chunks": [chunk.astuple() for chunk in chunks],
+            "glossary_terms": glossary_terms
+        }
+        temp_file = cache_file.with_name(f"{cache_file.name}.{_unique_suffix()}.tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            if temp_file.exists():
+                temp_file.unlink()
     
-    def _process_pdf(self, file_path: str) -> List[RequirementChunk]:
-        """Extract requirements from PDF files"""
+    def _process_single_file(self, source: SourceDocument) -> List[RequirementChunk]:
+        """Process a single loaded file and extract requirements"""
+        if source.on_disk and os.path.isdir(source.path):
+            return self._process_maildir(source)
+        file_ext = Path(source.path).suffix.lower()
+        return self._handler_for(file_ext)(source)
+    
+    def _handler_for(self, file_ext: str) -> Callable[[SourceDocument], List[RequirementChunk]]:
+        """Resolve the registered handler for an extension (loading entry points or modules on first use)"""
+        handler = _HANDLERS.get(file_ext)
+        if handler is None and not _entry_points_loaded:
+            _load_entry_point_handlers()
+            handler = _HANDLERS.get(file_ext)
+        if handler is None:
+            return getattr(self, _FALLBACK_HANDLER)
+        
+        if isinstance(handler, str) and ':' not in handler:
+            return getattr(self, handler)  # Built-in method; subclasses may override it
+        
+        if isinstance(handler, str):
+            module_name, _, attribute = handler.partition(':')
+            handler = getattr(importlib.import_module(module_name), attribute)
+        elif hasattr(handler, 'load'):
+            handler = handler.load()  # Entry point
+        _HANDLERS[file_ext] = handler
+        return lambda source: handler(self, source)
+    
+    def _process_pdf(self, source: SourceDocument) -> List[RequirementChunk]:
+        """Extract requirements from PDF files.
+        
+        Page text comes from the per-page cache when available (incremental
+        mode). In tiered mode the remaining pages are read from the PDF text
+        layer first; pages without a text layer are skipped and garbled pages
+        go on to pdfplumber. Layout extraction runs in parallel page ranges
+        when jobs > 1 and the document is large enough. The tier that handled
+        each page is recorded as pdf_pages in the processing log.
+        """
         chunks = []
         
+        pdfplumber = _optional_module("pdfplumber")
         if not pdfplumber:
             raise ImportError("PDF processing requires pdfplumber: pip install pdfplumber")
         
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if text:
-                    page_chunks = self._split_into_chunks(
-                        text, 
-                        file_path, 
-                        f"page {page_num}"
-                    )
-                    chunks.extend(page_chunks)
+        page_cache_dir = self._cache_dir.parent / "pages" if self._cache_dir is not None else None
+        
+        with pdfplumber.open(source.stream()) as pdf:
+            page_count = len(pdf.pages)
+            page_texts: Dict[int, str] = {}
+            page_tiers: Dict[int, str] = {}
+            page_keys: Dict[int, str] = {}
+            
+            if page_cache_dir is not None:
+                object_digests: Dict[int, bytes] = {}
+                for page_num, page in enumerate(pdf.pages, 1):
+                    page_keys[page_num] = self._pdf_page_key(page, object_digests)
+                    cache_file = page_cache_dir / f"{page_keys[page_num]}.txt"
+                    if cache_file.exists():
+                        page_texts[page_num] = cache_file.read_text(encoding='utf-8')
+                        page_tiers[page_num] = "cache"
+            
+            missing = [page_num for page_num in range(1, page_count + 1) if page_num not in page_texts]
+            
+            if self.pdf_extraction == 'tiered' and missing and _optional_module("PyPDF2"):
+                missing = self._extract_pdf_text_layer(source, missing, page_texts, page_tiers)
+            
+            if self.jobs > 1 and not self._in_worker and len(missing) >= 2 * PDF_PAGES_PER_TASK:
+                page_texts.update(self._extract_pdf_pages_parallel(source, missing))
+            else:
+                for page_num in missing:
+                    page_texts[page_num] = pdf.pages[page_num - 1].extract_text() or ""
+            for page_num in missing:
+                page_tiers[page_num] = "layout"
+        
+        new_pages = [page_num for page_num, tier in page_tiers.items() if tier != "cache"]
+        if page_cache_dir is not None and new_pages:
+            # Best effort, like the chunk cache: a failed write only costs a re-extraction next run
+            for page_num in new_pages:
+                cache_file = page_cache_dir / f"{page_keys[page_num]}.txt"
+                temp_file = cache_file.with_name(f"{cache_file.name}.{_unique_suffix()}.tmp")
+                try:
+                    page_cache_dir.mkdir(parents=True, exist_ok=True)
+                    temp_file.write_text(page_texts[page_num], encoding='utf-8')
+                    os.replace(temp_file, cache_file)
+                except OSError:
+                    if temp_file.exists():
+                        temp_file.unlink()
+        
+        source.meta["pdf_pages"] = [{"page": page_num, "tier": page_tiers[page_num]} for page_num in sorted(page_tiers)]
+        
+        for page_num in sorted(page_texts):
+            text = page_texts[page_num]
+            if text:
+                page_chunks = self._split_into_chunks(
+                    text, 
+                    source.path, 
+                    f"page {page_num}"
+                )
+                chunks.extend(page_chunks)
         
         return chunks
     
-    def _process_docx(self, file_path: str) -> List[RequirementChunk]:
+    def _extract_pdf_text_layer(self, source: SourceDocument, page_numbers: List[int], page_texts: Dict[int, str],
+                                page_tiers: Dict[int, str]) -> List[int]:
+        """Cheap tier: read the embedded text layer with PyPDF2; returns the pages that still need layout analysis"""
+        PyPDF2 = _optional_module("PyPDF2")
+        try:
+            reader = PyPDF2.PdfReader(source.stream())
+            pages = reader.pages
+        except Exception:
+            return page_numbers  # Let pdfplumber deal with (or report) a damaged file
+        
+        needs_layout = []
+        for page_num in page_numbers:
+            try:
+                page = pages[page_num - 1]
+                text = page.extract_text() or ""
+            except Exception:
+                needs_layout.append(page_num)
+                continue
+            
+            if not text.strip():
+                resources = page.get('/Resources')
+                resources = resources.get_object() if hasattr(resources, 'get_object') else (resources or {})
+                if '/Font' not in resources:
+                    # No fonts, no text layer (e.g. a scanned page): layout analysis finds nothing either
+                    page_texts[page_num] = ""
+                    page_tiers[page_num] = "no_text_layer"
+                else:
+                    needs_layout.append(page_num)
+            elif self._pdf_text_is_garbled(text):
+                needs_layout.append(page_num)
+            else:
+                page_texts[page_num] = text
+                page_tiers[page_num] = "text_layer"
+        
+        return needs_layout
+    
+    @staticmethod
+    def _pdf_text_is_garbled(text: str) -> bool:
+        """Heuristics for unusable text-layer output: unmapped glyphs, binary noise or lost word spacing"""
+        if '(cid:' in text:
+            return True
+        
+        visible = [ch for ch in text if not ch.isspace()]
+        if not visible:
+            return False
+        if text.count('\ufffd') > 0.01 * len(visible):
+            return True
+        if sum(1 for ch in visible if ch.isalnum() or ch in '.,;:!?()[]{}\'"-/%$&@#*+=<>_') < 0.7 * len(visible):
+            return True
+        
+        words = text.split()
+        return len(visible) / len(words) > 25  # Average "word" longer than 25 characters: spacing lost
+    
+    def _pdf_page_key(self, page: Any, memo: Dict[int, bytes]) -> str:
+        """Cache key for one page's text: digest of its content streams, resources and geometry.
+        
+        Keyed by page content rather than file hash, so editing one page of a
+        document only invalidates that page. Resources are hashed recursively
+        (form XObjects, fonts, ToUnicode maps, encodings), since text drawn
+        through them is not visible in the page's own content stream. `memo`
+        holds per-object digests shared across the pages of one document.
+        """
+        import pdfplumber
+        
+        digest = hashlib.sha256(f"{PDF_PAGE_CACHE_FORMAT}|{self.pdf_extraction}|{pdfplumber.__version__}|{page.bbox}|{page.rotation}".encode('utf-8'))
+        digest.update(_pdf_object_digest(page.page_obj.contents or [], memo))
+        digest.update(_pdf_object_digest(page.page_obj.resources or {}, memo))
+        return digest.hexdigest()[:32]
+    
+    def _extract_pdf_pages_parallel(self, source: SourceDocument, page_numbers: List[int]) -> Dict[int, str]:
+        """Extract page text across worker processes in contiguous page ranges"""
+        pdf_source = source.path if source.on_disk else bytes(source.stream().read())
+        ranges = [page_numbers[i:i + PDF_PAGES_PER_TASK] for i in range(0, len(page_numbers), PDF_PAGES_PER_TASK)]
+        workers = min(self.jobs, len(ranges))
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        page_texts = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(pdf_source,)) as executor:
+            for results in executor.map(_extract_pdf_pages, ranges):
+                page_texts.update(results)
+        return page_texts
+    
+    def _process_docx(self, source: SourceDocument) -> List[RequirementChunk]:
         """Extract requirements from DOCX files"""
-        if not Document:
+        docx = _optional_module("docx")
+        if not docx:
             raise ImportError("DOCX processing requires python-docx: pip install python-docx")
         
-        doc = Document(file_path)
+        doc = docx.Document(source.stream())
         chunks = []
         
         for para_num, paragraph in enumerate(doc.paragraphs, 1):
             if paragraph.text.strip():
                 chunk_text = paragraph.text.strip()
-                if self._is_requirement_candidate(chunk_text):
+                signals = self._scan_text(chunk_text)
+                if signals.is_candidate:
                     chunk = self._create_chunk(
                         chunk_text, 
-                        file_path, 
-                        f"paragraph {para_num}"
+                        source.path, 
+                        f"paragraph {para_num}",
+                        signals
                     )
                     chunks.append(chunk)
         
         return chunks
     
-    def _process_markdown(self, file_path: str) -> List[RequirementChunk]:
+    def _process_markdown(self, source: SourceDocument) -> List[RequirementChunk]:
         """Extract requirements from Markdown files"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = source.text()
         
-        # Split by headers to get sections
-        sections = re.split(r'^#{1,6}\s+', content, flags=re.MULTILINE)
+        # Sections are the spans between headers; they are split in place, without copies
+        bounds = [0]
+        for header in _MARKDOWN_HEADER_RE.finditer(content):
+            bounds.extend((header.start(), header.end()))
+        bounds.append(len(content))
         chunks = []
         
-        for i, section in enumerate(sections):
-            if section.strip():
-                section_chunks = self._split_into_chunks(
-                    section, 
-                    file_path, 
-                    f"section {i+1}"
-                )
-                chunks.extend(section_chunks)
+        for i in range(len(bounds) // 2):
+            section_chunks = self._split_into_chunks(
+                content, 
+                source.path, 
+                f"section {i+1}",
+                bounds[2 * i],
+                bounds[2 * i + 1]
+            )
+            chunks.extend(section_chunks)
         
         return chunks
     
-    def _process_email(self, file_path: str) -> List[RequirementChunk]:
+    def _process_email(self, source: SourceDocument) -> List[RequirementChunk]:
         """Extract requirements from email files"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        from email import message_from_string
+        from email.policy import default
         
-        if message_from_string:
-            try:
-                email_msg = message_from_string(content, policy=default)
-                body = email_msg.get_body(preferencelist=('plain', 'html'))
-                if body:
-                    content = str(body)
-            except:
-                pass  # Fallback to treating as plain text
+        content = source.text()
+        email_msg = None
         
-        return self._split_into_chunks(content, file_path, "email body")
-    
-    def _process_text(self, file_path: str) -> List[RequirementChunk]:
-        """Fallback processor for plain text files"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        try:
+            email_msg = message_from_string(content, policy=default)
+            body = email_msg.get_body(preferencelist=('plain', 'html'))
+            if body:
+                content = str(body)
+        except:
+            pass  # Fallback to treating as plain text
         
-        return self._split_into_chunks(content, file_path, "text file")
+        chunks = self._split_into_chunks(content, source.path, "email body")
+        if email_msg is not None and email_msg.is_multipart():
+            chunks.extend(self._attachment_chunks(email_msg, source, None))
+        return chunks
     
-    def _split_into_chunks(self, text: str, source_file: str, location_hint: str) -> List[RequirementChunk]:
-        """Split text into atomic requirement chunks"""
-        chunks = []
+    def _process_mbox(self, source: SourceDocument) -> List[RequirementChunk]:
+        """Extract requirements from an mbox mailbox, one message at a time.
         
-        # Split by sentences first
-        sentences = re.split(r'[.!?]+', text)
+        Messages are split at their "From " envelope lines while the mapped
+        file is read line by line, so only the message being parsed is ever
+        held as a copy. Body lines escaped as ">From " (mboxo/mboxrd) lose one
+        ">". Locations name the message by Message-ID.
+        """
+        from email.parser import BytesParser
+        from email.policy import default
         
-        current_chunk = ""
-        sentence_count = 0
+        parser = BytesParser(policy=default)
+        chunks = []
+        message_lines: List[bytes] = []
+        number = 0
+        for line in io.BufferedReader(source.stream()):
+            if line.startswith(b"From "):
+                if any(l.strip() for l in message_lines):
+                    number += 1
+                    chunks.extend(self._message_chunks(parser.parsebytes(b"".join(message_lines)), source, number))
+                message_lines = []
+            elif _MBOX_ESCAPED_FROM_RE.match(line):
+                message_lines.append(line[1:])
+            else:
+                message_lines.append(line)
+        if any(l.strip() for l in message_lines):
+            number += 1
+            chunks.extend(self._message_chunks(parser.parsebytes(b"".join(message_lines)), source, number))
+        source.meta["messages"] = number
+        return chunks
+    
+    def _process_maildir(self, source: SourceDocument) -> List[RequirementChunk]:
+        """Extract requirements from a Maildir directory, one message file at a time (new/ and cur/, by key)"""
+        from email.parser import BytesParser
+        from email.policy import default
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
+        parser = BytesParser(policy=default)
+        chunks = []
+        number = 0
+        for _, message_path in _maildir_messages(Path(source.path)):
+            try:
+                with open(message_path, 'rb') as f:
+                    message = parser.parse(f)
+            except FileNotFoundError:
+                continue  # Moved (new/ -> cur/) or deleted since the listing
+            number += 1
+            chunks.extend(self._message_chunks(message, source, number))
+        source.meta["messages"] = number
+        return chunks
+    
+    def _message_chunks(self, message: Any, source: SourceDocument, number: int, prefix: str = "message"
+                        ) -> List[RequirementChunk]:
+        """Body and attachment chunks of the number-th message of a mailbox (or of a message's attachments),
+        located as <prefix> <Message-ID>"""
+        message_id = str(message.get("Message-ID") or "").strip().strip("<>")
+        location = f"{prefix} {message_id or f'#{number}'}"
+        try:
+            chunks = []
+            body = message.get_body(preferencelist=('plain', 'html'))
+            if body is not None:
+                chunks.extend(self._split_into_chunks(body.get_content(), source.path, f"{location}, body"))
+            chunks.extend(self._attachment_chunks(message, source, location))
+        except Exception as e:  # One malformed message must not lose the rest of the mailbox
+            source.meta.setdefault("message_errors", []).append(f"{location}: {e}")
+            return []
+        return chunks
+    
+    def _attachment_chunks(self, message: Any, source: SourceDocument, location: Optional[str]) -> List[RequirementChunk]:
+        """Run a message's attachments through the handlers for their extensions, decoded in memory.
+        
+        Chunks keep the mailbox or email file as their source_file and name
+        the attachment in their location. Forwarded messages (message/rfc822)
+        are read like mailbox messages, whatever their filename. Other
+        attachments without a handler for their extension are skipped; failing
+        ones are listed in source.meta (attachment_errors) rather than failing
+        the whole file.
+        """
+        chunks = []
+        for number, part in enumerate(message.iter_attachments(), 1):
+            if part.get_content_type() == 'message/rfc822':
+                prefix = f"{location}, forwarded message" if location else "forwarded message"
+                chunks.extend(self._message_chunks(part.get_content(), source, number, prefix))
+                source.meta["attachments"] = source.meta.get("attachments", 0) + 1
                 continue
             
-            sentence_count += 1
-            test_chunk = current_chunk + " " + sentence if current_chunk else sentence
+            filename = part.get_filename()
+            file_ext = Path(filename).suffix.lower() if filename else ""
+            if file_ext and file_ext not in _HANDLERS and not _entry_points_loaded:
+                _load_entry_point_handlers()
+            if file_ext not in _HANDLERS:
+                source.meta["attachments_skipped"] = source.meta.get("attachments_skipped", 0) + 1
+                continue
             
-            # Check if chunk is getting too long (≈400-600 tokens ≈ 300-450 words, optimized for modern LLMs)
-            word_count = len(test_chunk.split())
+            prefix = f"{location}, attachment {filename}" if location else f"attachment {filename}"
+            try:
+                content = part.get_content()
+                if isinstance(content, str):
+                    content = content.encode('utf-8')
+                with SourceDocument(filename, content) as attachment:
+                    attachment_chunks = self._handler_for(file_ext)(attachment)
+            except Exception as e:
+                source.meta.setdefault("attachment_errors", []).append(f"{prefix}: {e}")
+                continue
             
-            if word_count > 300 and current_chunk:
-                # Save current chunk and start new one
-                if self._is_requirement_candidate(current_chunk):
-                    chunk = self._create_chunk(
-                        current_chunk,
-                        source_file,
-                        f"{location_hint}, sent {sentence_count - 1}"
-                    )
-                    chunks.append(chunk)
-                current_chunk = sentence
-            else:
-                current_chunk = test_chunk
-        
-        # Handle the last chunk
-        if current_chunk and self._is_requirement_candidate(current_chunk):
-            chunk = self._create_chunk(
-                current_chunk,
-                source_file,
-                f"{location_hint}, sent {sentence_count}"
-            )
-            chunks.append(chunk)
-        
+            source_file = sys.intern(Path(source.path).name)
+            for chunk in attachment_chunks:
+                chunk.source_file = source_file
+                chunk.location_hint = f"{prefix}, {chunk.location_hint}"
+            chunks.extend(attachment_chunks)
+            source.meta["attachments"] = source.meta.get("attachments", 0) + 1
         return chunks
     
+    def _process_text(self, source: SourceDocument) -> List[RequirementChunk]:
+        """Fallback processor for plain text files"""
+        return self._split_into_chunks(source.text(), source.path, "text file")
+    
+    def _split_into_chunks(self, text: str, source_file: str, location_hint: str,
+                           start: int = 0, end: Optional[int] = None) -> List[RequirementChunk]:
+        """Split text[start:end] into atomic requirement chunks.
+        
+        Sentences are found in place with one regex scan and packed greedily
+        up to chunk_size (in chunk_unit) using running word/character counts,
+        so each sentence is tokenized once and each emitted chunk is joined
+        once. With chunk_overlap, the last N sentences of a chunk also open the
+        next one. With spans, chunks record their offsets in text and keep a
+        reference to it rather than a copy of their own.
+        """
+        with self._stage("split"):
+            chunks = []
+            
+            current: deque = deque()  # (sentence, words, chars, start, end)
+            current_words = 0
+            current_chars = 0
+            sentence_count = 0
+            
+            def emit(last_sentence: int) -> None:
+                chunk_text = " ".join(sentence for sentence, _, _, _, _ in current)
+                signals = self._scan_text(chunk_text)
+                if signals.is_candidate:
+                    span = (text, current[0][3], current[-1][4]) if self.spans else None
+                    chunks.append(self._create_chunk(
+                        chunk_text,
+                        source_file,
+                        f"{location_hint}, sent {last_sentence}",
+                        signals,
+                        span
+                    ))
+            
+            for match in _SENTENCE_RE.finditer(text, start, len(text) if end is None else end):
+                sentence = match.group()
+                sentence_count += 1
+                words = len(sentence.split())
+                chars = len(sentence)
+                
+                # Check if chunk is getting too long (default 300 words ≈ 400 tokens, optimized for modern LLMs)
+                if current and self._chunk_measure(current_words + words, current_chars + 1 + chars) > self.chunk_size:
+                    # Save current chunk and start new one from the overlap tail
+                    emit(sentence_count - 1)
+                    while len(current) > self.chunk_overlap:
+                        _, dropped_words, dropped_chars, _, _ = current.popleft()
+                        current_words -= dropped_words
+                        current_chars -= dropped_chars + 1
+                    
+                    # Overlap never blocks progress: shed it until the new sentence fits
+                    while current and self._chunk_measure(current_words + words, current_chars + 1 + chars) > self.chunk_size:
+                        _, dropped_words, dropped_chars, _, _ = current.popleft()
+                        current_words -= dropped_words
+                        current_chars -= dropped_chars + 1
+                
+                current.append((sentence, words, chars, match.start(), match.end()))
+                current_words += words
+                current_chars += chars + 1  # Joining space (one too many, corrected in the measure)
+            
+            # Handle the last chunk
+            if current:
+                emit(sentence_count)
+            
+            return chunks
+    
+    def _chunk_measure(self, words: int, chars: int) -> int:
+        """Size of a candidate chunk in chunk_unit (chars includes one extra joining space)"""
+        if self.chunk_unit == 'words':
+            return words
+        if self.chunk_unit == 'chars':
+            return chars - 1
+        return -(-(chars - 1) // 4)  # tokens: ~4 characters per token, rounded up
+    
+    def _scan_text(self, text: str) -> TextSignals:
+        """Run the compiled keyword matcher over text (compiled once per process)"""
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self.classification_keywords, self.requirement_indicators, self.confidence_keywords)
+        if self._profiler is not None:
+            with self._profiler.stage("classify"):
+                return self._matcher.scan(text)
+        return self._matcher.scan(text)
+    
     def _is_requirement_candidate(self, text: str) -> bool:
         """Determine if text contains requirements"""
-        text_lower = text.lower()
-        
-        # Skip very short texts
-        if len(text.split()) < 3:
-            return False
-        
-        # Look for requirement indicators
-        requirement_indicators = [
-            'shall', 'must', 'will', 'should', 'requires', 'needs',
-            'system', 'user', 'application', 'feature', 'function'
-        ]
-        
-        return any(indicator in text_lower for indicator in requirement_indicators)
+        return self._scan_text(text).is_candidate
     
-    def _create_chunk(self, text: str, source_file: str, location_hint: str) -> RequirementChunk:
-        """Create a RequirementChunk with classification"""
-        # Generate unique ID
-        chunk_id = f"R-{hash(text + source_file + location_hint) % 10000:04d}"
-        
-        # Classify the requirement
-        tags = self._classify_requirement(text)
+    def _create_chunk(self, text: str, source_file: str, location_hint: str, signals: Optional[TextSignals] = None,
+                      span: Optional[Tuple[str, int, int]] = None) -> RequirementChunk:
+        """Create a RequirementChunk with classification (span = (buffer, start, end) for a text-less chunk)"""
+        # Stable content ID (the batch session resolves prefix collisions and duplicates)
+        chunk_id = content_id(content_digest(text))
         
-        # Calculate confidence based on text clarity
-        confidence = self._calculate_confidence(text)
+        # Classify the requirement and score its clarity in one pass
+        if signals is None:
+            signals = self._scan_text(text)
         
         return RequirementChunk(
             id=chunk_id,
             source_file=Path(source_file).name,
             location_hint=location_hint,
-            text=text.strip(),
-            tags=tags,
-            confidence=confidence
+            text=text.strip() if span is None else None,
+            tags=signals.tags,
+            confidence=signals.confidence,
+            span=span[1:] if span is not None else None,
+            buffer=span[0] if span is not None else None
         )
     
     def _classify_requirement(self, text: str) -> List[str]:
         """Classify requirement into tags"""
-        text_lower = text.lower()
-        tags = []
-        
-        for category, keywords in self.classification_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                tags.append(category)
-        
-        # Default to functional if no other tags
-        if not tags:
-            tags = ['functional']
-        
-        return tags
+        return self._scan_text(text).tags
     
     def _calculate_confidence(self, text: str) -> float:
         """Calculate confidence score based on text clarity"""
-        score = 0.5  # Base score
-        
-        # Higher confidence for clear requirement language
-        if any(word in text.lower() for word in ['shall', 'must', 'will']):
-            score += 0.3
-        
-        # Higher confidence for specific measurements
-        if re.search(r'\d+', text):
-            score += 0.2
-        
-        # Lower confidence for vague language
-        if any(word in text.lower() for word in ['maybe', 'probably', 'might', 'unclear']):
-            score -= 0.3
-        
-        # Lower confidence for very long sentences
-        if len(text.split()) > 50:
-            score -= 0.2
-        
-        return max(0.0, min(1.0, score))
+        return self._scan_text(text).confidence
     
     def _extract_glossary_suspects(self, text: str) -> List[str]:
         """Extract potential glossary terms from text"""
@@ -415,20 +2617,13 @@ class RequirementsIngestor:
     
     def _chunk_to_dict(self, chunk: RequirementChunk) -> Dict[str, Any]:
         """Convert RequirementChunk to dictionary"""
-        return {
-            "id": chunk.id,
-            "source_file": chunk.source_file,
-            "location_hint": chunk.location_hint,
-            "text": chunk.text,
-            "tags": chunk.tags,
-            "confidence": round(chunk.confidence, 2)
-        }
+        return chunk.to_dict()
     
     def _calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA256 hash of file"""
         try:
-            with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()[:16]  # First 16 chars
+            with SourceDocument.open(file_path) as source:
+                return source.sha256()[:16]  # First 16 chars
         except:
             return "unknown"
     
@@ -444,8 +2639,18 @@ class RequirementsIngestor:
         
         return analysis_dir
     
-    def _save_outputs(self, project_id: str, requirements: Dict, log: Dict, glossary: Dict, source_files: List[str]) -> Dict[str, str]:
-        """Save all outputs to structured folders with dual format (JSON + Markdown)"""
+    def _save_outputs(self, project_id: str, requirements: Dict, log: Dict, glossary: Dict, source_files: List[str],
+                      chunks: Optional[List[RequirementChunk]] = None, markdown: Optional[MarkdownReportWriter] = None,
+                      batch: Optional[OutputBatch] = None) -> Dict[str, str]:
+        """Save all outputs to structured folders with dual format (JSON + Markdown).
+        
+        Given the batch's chunks, requirements.json encodes them directly
+        instead of the dicts in requirements["requirements"]. markdown is a
+        report writer that already holds the batch's rows; without one the
+        rows are rendered from the requirement dicts. Every file is staged in
+        an OutputBatch (the caller's, which may already hold the sidecar) and
+        published together with the version store commit.
+        """
         analysis_dir = self._create_project_directory(project_id)
         
         # Define file paths within Analysis folder
@@ -454,45 +2659,62 @@ class RequirementsIngestor:
         log_file = analysis_dir / "processing_log.json"
         glossary_file = analysis_dir / "glossary.json"
         
-        # Handle versioning - backup existing files
-        if requirements_json_file.exists():
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-            version_json_file = analysis_dir / "versions" / f"v1_{timestamp}.json"
-            requirements_json_file.rename(version_json_file)
-        
-        if requirements_md_file.exists():
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-            version_md_file = analysis_dir / "versions" / f"v1_{timestamp}.md"
-            requirements_md_file.rename(version_md_file)
-        
-        # Generate Markdown output matching original specification
-        markdown_content = self._generate_markdown_output(requirements, source_files)
-        
-        # Save files (JSON + Markdown)
-        with open(requirements_json_file, 'w', encoding='utf-8') as f:
-            json.dump(requirements, f, indent=2, ensure_ascii=False)
-        
-        with open(requirements_md_file, 'w', encoding='utf-8') as f:  # NEW: Markdown file
-            f.write(markdown_content)
-        
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(log, f, indent=2, ensure_ascii=False)
+        batch = batch if batch is not None else OutputBatch(analysis_dir, self.lock_timeout)
+        try:
+            with self._stage("serialize"):
+                # Save files (JSON + Markdown)
+                self.serializer.dump(dict(requirements, requirements=chunks) if chunks is not None else requirements,
+                                     batch.stage(requirements_json_file))
+                
+                if markdown is None:
+                    markdown = MarkdownReportWriter(requirements_md_file, self.markdown_page_size)
+                    for record in requirements["requirements"]:
+                        markdown.add_record(record)
+                markdown.finish(project_id, source_files, requirements.get("generated_at", "Unknown"),
+                                requirements["glossary_suspects"], requirements.get("processing_summary"), batch)
+                
+                self.serializer.dump(glossary, batch.stage(glossary_file))
+                
+                # Create source file mapping
+                self._create_source_mapping(analysis_dir, log["input_files"], batch)
             
-        with open(glossary_file, 'w', encoding='utf-8') as f:
-            json.dump(glossary, f, indent=2, ensure_ascii=False)
-        
-        # Create source file mapping
-        self._create_source_mapping(analysis_dir, log["input_files"])
-        
-        return {
+            # The log goes last so that it can carry the complete profile
+            if self._profiler is not None:
+                log["profile"] = self.last_profile = self._profile_summary(log)
+            self.serializer.dump(log, batch.stage(log_file))
+            
+            # Record this run in the version store (only requirements not seen in earlier versions are added)
+            def commit_version() -> int:
+                if chunks is not None:
+                    records = (chunk.to_json().encode('utf-8') for chunk in chunks)
+                else:
+                    records = (json.dumps(record, ensure_ascii=False, separators=_COMPACT_SEPARATORS).encode('utf-8')
+                               for record in requirements["requirements"])
+                return VersionStore(analysis_dir / "versions").commit(requirements, records)
+            
+            version = batch.publish(commit_version if self.versioning else None)
+        except BaseException:
+            batch.discard()
+            if markdown is not None:
+                markdown.discard()
+            raise
+        
+        output_paths = {
             "base_dir": str(analysis_dir),
             "requirements_json": str(requirements_json_file),
             "requirements_md": str(requirements_md_file),  # NEW: Markdown output path
             "log": str(log_file),
             "glossary": str(glossary_file)
         }
+        if version is not None:
+            output_paths["version"] = f"v{version:04d}"
+        return output_paths
     
-    def _create_source_mapping(self, analysis_dir: Path, input_files: List[Dict]) -> None:
+    def load_version(self, project_id: str, version: Optional[int] = None) -> Dict[str, Any]:
+        """requirements.json as saved by an earlier run of project_id (the latest version by default)"""
+        return VersionStore(self.output_base_dir / "projects" / project_id / "Analysis" / "versions").load(version)
+    
+    def _create_source_mapping(self, analysis_dir: Path, input_files: List[Dict], batch: Optional[OutputBatch] = None) -> None:
         """Create source file mapping and optionally copy files"""
         mapping = {
             "created_at": datetime.now().isoformat(),
@@ -511,53 +2733,58 @@ class RequirementsIngestor:
             mapping["source_files"].append(file_mapping)
         
         mapping_file = analysis_dir / "source_files" / "file_mapping.json"
-        with open(mapping_file, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2, ensure_ascii=False)
+        self.serializer.dump(mapping, batch.stage(mapping_file) if batch is not None else mapping_file)
     
     def _create_glossary_output(self, project_id: str, terms: List[str], requirements: List[RequirementChunk]) -> Dict:
         """Create enhanced glossary output"""
+        # One pass over the chunks; every term lookup below is served by the index
+        index = GlossaryIndex()
+        for chunk in requirements:
+            index.add(chunk.id, chunk.text)
+        
+        return self._glossary_from_index(project_id, terms, index, lambda i: requirements[i].text)
+    
+    def _glossary_from_index(self, project_id: str, terms: List[str], index: GlossaryIndex, text_of: Callable[[int], str]) -> Dict:
+        """Build glossary output from a populated index; text_of(i) returns the text of chunk i"""
         glossary_data = {
             "project_id": project_id,
             "extracted_terms": [],
             "suggested_definitions": []
         }
         
-        # Count term frequencies and find contexts
+        # Count term frequencies (number of chunks mentioning the term)
         term_info = {}
+        term_postings = {}
         for term in terms:
-            contexts = []
-            frequency = 0
-            
-            for chunk in requirements:
-                if term.lower() in chunk.text.lower():
-                    frequency += 1
-                    # Extract sentence containing the term
-                    sentences = chunk.text.split('.')
-                    for sentence in sentences:
-                        if term.lower() in sentence.lower():
-                            contexts.append(sentence.strip())
-                            break
-            
-            if frequency > 0:
+            postings = index.lookup(term, text_of)
+            if postings:
+                term_postings[term] = postings
                 term_info[term] = {
                     "term": term,
-                    "frequency": frequency,
-                    "contexts": list(set(contexts))[:3],  # Max 3 unique contexts
-                    "confidence": min(0.95, 0.5 + (frequency * 0.1))  # Higher freq = higher confidence
+                    "frequency": len(postings),
+                    "contexts": [],
+                    "confidence": min(0.95, 0.5 + (len(postings) * 0.1))  # Higher freq = higher confidence
                 }
         
         # Sort by frequency and add to output
         sorted_terms = sorted(term_info.values(), key=lambda x: x["frequency"], reverse=True)
         glossary_data["extracted_terms"] = sorted_terms[:20]  # Top 20 terms
         
+        # Contexts: sentence containing the term, max 3 unique, only for reported terms
+        for term_data in glossary_data["extracted_terms"]:
+            contexts = {}
+            for chunk_index, sentence_index in term_postings[term_data["term"]].items():
+                if sentence_index >= 0:
+                    contexts[text_of(chunk_index).split('.')[sentence_index].strip()] = None
+                    if len(contexts) == 3:
+                        break
+            term_data["contexts"] = list(contexts)
+        
         # Generate suggested definitions for high-frequency terms
         for term_data in sorted_terms[:10]:  # Top 10 get suggested definitions
             if term_data["frequency"] >= 3:
-                # Find requirements that mention this term
-                sources = []
-                for chunk in requirements:
-                    if term_data["term"].lower() in chunk.text.lower():
-                        sources.append(chunk.id)
+                # Requirements that mention this term, straight from the index
+                sources = [index.chunk_ids[i] for i in term_postings[term_data["term"]]]
                 
                 suggestion = {
                     "term": term_data["term"],
@@ -567,78 +2794,607 @@ class RequirementsIngestor:
                 glossary_data["suggested_definitions"].append(suggestion)
         
         return glossary_data
+
+
+class _InotifyWaiter:
+    """Blocks until something changes in the watched directories (Linux inotify through ctypes)"""
     
-    def _generate_markdown_output(self, requirements_output: Dict, source_files: List[str]) -> str:
-        """Generate Markdown output matching original specification"""
-        project_id = requirements_output["project_id"]
-        requirements = requirements_output["requirements"]
-        glossary_suspects = requirements_output["glossary_suspects"]
-        
-        # Start with header
-        markdown_lines = [
-            "# Requirements Analysis Report",
-            "",
-            f"**Project**: {project_id}",
-            f"**Source**: {', '.join([Path(f).name for f in source_files])}",
-            f"**Generated**: {requirements_output.get('generated_at', 'Unknown')}",
-            f"**Total Requirements**: {requirements_output.get('total_requirements', len(requirements))}",
-            "",
-            "## Requirements",
-            "",
-            "| ID | Section | Text | Tags | Confidence |",
-            "|----|---------|------|------|-----------|"
-        ]
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    MASK = 0x002 | 0x004 | 0x008 | 0x040 | 0x080 | 0x100 | 0x200 | 0x400 | 0x800
+    IN_IGNORED = 0x8000  # The kernel dropped a watch (its directory was deleted or unmounted)
+    _EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watched: Dict[int, Path] = {}  # Watch descriptor -> directory
+    
+    def watch(self, directories: Iterable[Path]) -> None:
+        """Add watches for directories not watched yet (missing ones are skipped)"""
+        watched = set(self._watched.values())
+        for directory in directories:
+            if directory not in watched:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+                if wd >= 0:
+                    self._watched[wd] = directory
+    
+    def wait(self, timeout: float) -> bool:
+        """True if events arrived within timeout (they are drained, the caller rescans).
+        
+        Watches the kernel dropped are forgotten, so a deleted directory that
+        is recreated gets watched again by the next watch() call.
+        """
+        import select
         
-        # Add each requirement as table row
-        for req in requirements:
-            # Clean text for table (remove newlines, limit length)
-            clean_text = req["text"].replace("\n", " ").replace("|", "\\|")
-            if len(clean_text) > 80:
-                clean_text = clean_text[:77] + "..."
-            
-            # Map location_hint to section
-            section = req.get("location_hint", "Unknown").replace("|", "\\|")
-            
-            # Format tags
-            tags = ", ".join(req["tags"])
-            
-            # Map numeric confidence to text
-            confidence = req["confidence"]
-            if confidence >= 0.8:
-                conf_text = "high"
-            elif confidence >= 0.6:
-                conf_text = "medium"
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while True:
+                events = os.read(self._fd, 65536)
+                if not events:
+                    break
+                offset = 0
+                while offset < len(events):
+                    wd, mask, _, name_length = self._EVENT_HEADER.unpack_from(events, offset)
+                    if mask & self.IN_IGNORED:
+                        self._watched.pop(wd, None)
+                    offset += self._EVENT_HEADER.size + name_length
+        except BlockingIOError:
+            pass
+        return True
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWaiter:
+    """Fallback waiter: every poll_interval counts as a possible change"""
+    
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+    
+    def watch(self, directories: Iterable[Path]) -> None:
+        pass
+    
+    def wait(self, timeout: float) -> bool:
+        time.sleep(min(timeout, self.poll_interval))
+        return True
+    
+    def close(self) -> None:
+        pass
+
+
+class ProjectWatcher:
+    """Keeps a project's outputs current while its input files change (--watch).
+    
+    Inputs are files and directories (searched recursively for every
+    registered format, skipping the output directory). Per-file results are
+    kept between runs, so after a burst of saves has been quiet for
+    debounce seconds only the added and changed files are ingested again;
+    removed files are dropped, and requirements.json, the Markdown report
+    and the other outputs are republished from the kept results. Changes are
+    noticed through inotify where available and by polling file stats every
+    poll_interval seconds otherwise.
+    """
+    
+    def __init__(self, ingestor: RequirementsIngestor, project_id: str, paths: List[str], debounce: float = 1.0,
+                 poll_interval: float = 1.0, use_inotify: bool = True):
+        self.ingestor = ingestor
+        self.project_id = project_id
+        self.paths = [Path(path) for path in paths]
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}  # path -> (mtime_ns, size) at the last ingest
+        self._results: Dict[str, Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]] = {}
+        self.last_changes: Tuple[List[str], List[str], List[str]] = ([], [], [])  # (added, changed, removed)
+        self._stopped = False
+        self._waiter: Any = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._waiter = _InotifyWaiter()
+            except (OSError, AttributeError):
+                pass  # No usable inotify (e.g. missing libc symbol or watch limit); poll instead
+        if self._waiter is None:
+            self._waiter = _PollingWaiter(poll_interval)
+    
+    @property
+    def uses_inotify(self) -> bool:
+        return isinstance(self._waiter, _InotifyWaiter)
+    
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Current (mtime_ns, size) of every input file, in ingest order"""
+        output_dir = self.ingestor.output_base_dir.resolve()
+        extensions = set(_HANDLERS)
+        snapshot = {}
+        for path in self.paths:
+            if path.is_dir() and _is_maildir(path):
+                try:
+                    snapshot.setdefault(str(path), _maildir_stat(path))
+                except FileNotFoundError:
+                    pass
+                continue
+            if path.is_dir():
+                candidates = sorted(p for p in path.rglob("*") if p.suffix.lower() in extensions and p.is_file()
+                                    and output_dir not in p.resolve().parents)
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                try:
+                    stat = candidate.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot.setdefault(str(candidate), (stat.st_mtime_ns, stat.st_size))
+        return snapshot
+    
+    def _watch_directories(self) -> None:
+        directories = set()
+        for path in self.paths:
+            if path.is_dir():
+                directories.add(path)
+                directories.update(p for p in path.rglob("*") if p.is_dir())
             else:
-                conf_text = "low"
+                directories.add(path.parent)
+        output_dir = self.ingestor.output_base_dir.resolve()
+        self._waiter.watch(d for d in directories if d.resolve() != output_dir and output_dir not in d.resolve().parents)
+    
+    def changes(self, snapshot: Dict[str, Tuple[int, int]]) -> Tuple[List[str], List[str], List[str]]:
+        """(added, changed, removed) input files between the last ingest and snapshot"""
+        added = [path for path in snapshot if path not in self._snapshot]
+        changed = [path for path in snapshot if path in self._snapshot and snapshot[path] != self._snapshot[path]]
+        removed = [path for path in self._snapshot if path not in snapshot]
+        return added, changed, removed
+    
+    def start(self) -> Dict[str, Any]:
+        """Ingest every input once and publish the outputs"""
+        self._watch_directories()
+        self._snapshot = {}
+        self._results = {}
+        return self.refresh()
+    
+    def refresh(self) -> Dict[str, Any]:
+        """Re-ingest added and changed files, drop removed ones and republish the outputs.
+        
+        The stats are taken before the files are read, so a save that lands
+        during the refresh shows up as a change on the next one.
+        """
+        snapshot = self.scan()
+        added, changed, removed = self.last_changes = self.changes(snapshot)
+        for path in removed:
+            del self._results[path]
+        # Settle the cache settings before files are ingested (and before any worker pool copies them)
+        self.ingestor._prepare_run(self.project_id)
+        for result in self.ingestor._iter_file_results(added + changed):
+            self._results[result[0]["file_path"]] = result
+        self._snapshot = snapshot
+        
+        files = [path for path in snapshot if path in self._results]
+        return self.ingestor.process_results(files, self.project_id, [self._results[path] for path in files])
+    
+    def run(self) -> None:
+        """Watch until stop() or Ctrl+C, refreshing after each quiet burst of changes"""
+        self.start()
+        print(f"👀 Watching {len(self._snapshot)} files ({'inotify' if self.uses_inotify else 'polling'}); Ctrl+C to stop")
+        seen = self._snapshot
+        last_change = time.monotonic()
+        try:
+            while not self._stopped:
+                pending = seen != self._snapshot
+                woke = self._waiter.wait(self.debounce if pending else self.poll_interval)
+                if woke:
+                    self._watch_directories()  # Pick up new subdirectories
+                    snapshot = self.scan()
+                    if snapshot != seen:
+                        seen = snapshot
+                        last_change = time.monotonic()
+                        continue
+                if seen != self._snapshot and time.monotonic() - last_change >= self.debounce:
+                    started = time.perf_counter()
+                    result = self.refresh()
+                    added, changed, removed = self.last_changes
+                    seen = self._snapshot
+                    print(f"🔄 {len(added)} added, {len(changed)} changed, {len(removed)} removed: "
+                          f"{result['total_requirements']} requirements ({time.perf_counter() - started:.2f}s)")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+        finally:
+            self._waiter.close()
+    
+    def stop(self) -> None:
+        """Make run() return after its current wait"""
+        self._stopped = True
+
+
+class ServerBusyError(RuntimeError):
+    """IngestServer refused a job because its queue is full"""
+
+
+class IngestServer:
+    """Local ingestion service that keeps one warm ingestor between jobs (--serve).
+    
+    Format libraries are imported once at start-up and, with jobs > 1, files
+    are parsed on one long-lived worker pool whose workers are warmed the
+    same way, so a job pays for neither process start-up nor imports. At
+    most max_concurrent jobs run at a time and up to max_queue more wait;
+    further jobs are refused (ServerBusyError, HTTP 503) so that clients back
+    off instead of piling up. Each job runs on a shallow copy of the template
+    ingestor: jobs share its configuration and keyword tables, not its
+    per-batch state. With incremental=True and a worker pool, all projects
+    share one chunk cache (cache_dir, by default <output_base_dir>/cache),
+    as pool workers cannot switch caches between jobs.
+    
+    Over HTTP (host:port or unix:/path/to.sock), POST /ingest takes
+    {"project_id": ..., "files": [...], "save": true} and streams NDJSON
+    progress events (queued, started, one per file, then done or error);
+    GET /health reports the queue.
+    """
+    
+    def __init__(self, ingestor: RequirementsIngestor, max_concurrent: int = 2, max_queue: int = 16):
+        self.ingestor = ingestor
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self._slots = threading.Semaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._executor: Any = None
+    
+    def start(self) -> None:
+        """Import format libraries and start the warm worker pool (jobs > 1)"""
+        _warm_up()
+        if self.ingestor.jobs > 1 and self._executor is None:
+            if self.ingestor.incremental and self.ingestor.cache_dir is None:
+                # Workers keep the cache settings they start with, so every project shares one cache
+                self.ingestor = copy.copy(self.ingestor)
+                self.ingestor.cache_dir = self.ingestor.output_base_dir / "cache"
+            self.ingestor._prepare_run()
+            self._executor = _start_warm_pool(self.ingestor)
+    
+    def close(self) -> None:
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ok",
+                "running": self.running,
+                "queued": self.queued,
+                "completed": self.completed,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "workers": self.ingestor.jobs if self._executor is not None else 0
+            }
+    
+    def submit(self, project_id: str, files: List[str], save_to_file: bool = True,
+               progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run one ingest job, blocking while it waits for a slot; returns the job summary.
+        
+        progress receives each event dict as it happens. Raises
+        ServerBusyError at once when max_queue jobs are already waiting, and
+        ValueError for a project_id that is not a single safe path component.
+        """
+        if not _SAFE_PROJECT_ID_RE.fullmatch(project_id):
+            raise ValueError(f"Invalid project_id {project_id!r}: use letters, digits, '.', '_' and '-', starting with a letter or digit")
+        emit = progress if progress is not None else (lambda event: None)
+        with self._lock:
+            if self.running + self.queued >= self.max_concurrent + self.max_queue:
+                raise ServerBusyError(f"{self.queued} jobs already queued")
+            self.queued += 1
+            ahead = max(0, self.running + self.queued - self.max_concurrent - 1)
+        emit({"event": "queued", "jobs_ahead": ahead})
+        
+        self._slots.acquire()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        started = time.perf_counter()
+        try:
+            emit({"event": "started", "project_id": project_id, "files": len(files)})
+            ingestor = copy.copy(self.ingestor)
+            ingestor._executor = self._executor
             
-            markdown_lines.append(
-                f"| {req['id']} | {section} | {clean_text} | {tags} | {conf_text} |"
-            )
+            def results() -> Iterator[Tuple[Dict[str, Any], List[RequirementChunk], List[str], Optional[str]]]:
+                for number, result in enumerate(ingestor._iter_file_results(files), 1):
+                    file_info, chunks, _, error = result
+                    emit({"event": "file", "file": number, "of": len(files), "file_path": file_info["file_path"],
+                          "chunks": len(chunks), "error": error})
+                    yield result
+            
+            output = ingestor.process_results(files, project_id, results(), save_to_file)
+            summary = {
+                "project_id": project_id,
+                "total_requirements": output["total_requirements"],
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            if save_to_file:
+                summary["output_paths"] = ingestor.last_output_paths
+            else:
+                summary["requirements"] = output
+            return summary
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+            self._slots.release()
+    
+    def make_server(self, address: str) -> Any:
+        """HTTP server bound to "host:port" or "unix:/path/to.sock" (call serve_forever() on it)"""
+        import socketserver
+        from http.server import ThreadingHTTPServer
+        
+        handler = _ingest_request_handler(self)
+        if address.startswith("unix:"):
+            class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+                daemon_threads = True
+            
+            socket_path = address[len("unix:"):]
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)  # Stale socket from an earlier server
+            return UnixHTTPServer(socket_path, handler)
         
-        # Add glossary section
-        if glossary_suspects:
-            markdown_lines.extend([
-                "",
-                "## Glossary Suspects",
-                ""
-            ])
-            for term in sorted(glossary_suspects):
-                markdown_lines.append(f"- {term}")
+        host, _, port = address.rpartition(":")
+        return ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+    
+    def serve(self, address: str) -> None:
+        """Start, then serve requests until Ctrl+C"""
+        self.start()
+        server = self.make_server(address)
+        print(f"🛰️ Serving on {address} (max {self.max_concurrent} concurrent jobs, {self.max_queue} queued); Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped")
+        finally:
+            server.server_close()
+            self.close()
+
+
+def _ingest_request_handler(service: IngestServer) -> type:
+    """BaseHTTPRequestHandler subclass serving /ingest and /health for service"""
+    from http.server import BaseHTTPRequestHandler
+    
+    class IngestRequestHandler(BaseHTTPRequestHandler):
+        server_version = TOOL_VERSION
+        
+        def address_string(self) -> str:
+            # Unix socket peers have no (host, port) address
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+        
+        def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            encoded = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(encoded)
+        
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send_json(200, service.status())
+            else:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
         
-        # Add processing summary if available
-        if "processing_summary" in requirements_output:
-            summary = requirements_output["processing_summary"]
-            markdown_lines.extend([
-                "",
-                "## Processing Summary",
-                "",
-                f"- **Files processed**: {summary.get('total_files', 'Unknown')}",
-                f"- **Requirements extracted**: {summary.get('total_requirements', 'Unknown')}",
-                f"- **Average confidence**: {summary.get('avg_confidence', 'Unknown')}",
-                f"- **Processing time**: {summary.get('processing_time_seconds', 'Unknown')}s"
-            ])
+        def do_POST(self) -> None:
+            if self.path != "/ingest":
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                project_id, files = job["project_id"], job["files"]
+                if not isinstance(project_id, str) or not isinstance(files, list) or not all(isinstance(f, str) for f in files):
+                    raise TypeError("project_id must be a string and files a list of strings")
+                if not _SAFE_PROJECT_ID_RE.fullmatch(project_id):
+                    raise ValueError(f"project_id {project_id!r} must be letters, digits, '.', '_' and '-', starting with a letter or digit")
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {"error": f"Invalid job: {e}"})
+                return
+            
+            streaming = {"started": False, "connected": True}
+            
+            def emit(event: Dict[str, Any]) -> None:
+                if not streaming["connected"]:
+                    return  # The job still runs to completion and publishes its outputs
+                try:
+                    if not streaming["started"]:
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/x-ndjson")
+                        self.end_headers()
+                        streaming["started"] = True
+                    self.wfile.write(json.dumps(event, ensure_ascii=False).encode('utf-8') + b"\n")
+                    self.wfile.flush()
+                except OSError:
+                    streaming["connected"] = False
+            
+            try:
+                summary = service.submit(project_id, files, bool(job.get("save", True)), emit)
+                emit({"event": "done", **summary})
+            except ServerBusyError as e:
+                self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+            except Exception as e:
+                emit({"event": "error", "error": str(e)})
+    
+    return IngestRequestHandler
+
+
+def load_manifest(path: str) -> Dict[str, List[str]]:
+    """Read a batch manifest into {project_id: input globs}, with globs made relative to the manifest.
+    
+    The manifest is JSON, or YAML (.yaml/.yml, needs PyYAML), holding either
+    {"projects": ...} or the projects directly: a mapping of project ID to
+    one glob or a list of globs, or a list of {"project_id", "inputs"}.
+    Raises ValueError for a malformed manifest.
+    """
+    manifest_path = Path(path)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if manifest_path.suffix.lower() in ('.yaml', '.yml'):
+        yaml = _optional_module("yaml")
+        if yaml is None:
+            raise ValueError("YAML manifests need PyYAML (pip install pyyaml); use a JSON manifest instead")
+        try:
+            manifest = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML manifest: {e}") from e
+    else:
+        try:
+            manifest = json.loads(content)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON manifest: {e}") from e
+    
+    entries = manifest.get("projects") if isinstance(manifest, dict) else manifest
+    if isinstance(entries, dict):
+        entries = [{"project_id": project_id, "inputs": inputs} for project_id, inputs in entries.items()]
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("The manifest lists no projects")
+    
+    base_dir = manifest_path.parent
+    projects: Dict[str, List[str]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("project_id"), str):
+            raise ValueError(f"Project entries need a project_id: {entry!r}")
+        project_id = entry["project_id"]
+        inputs = entry.get("inputs", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if not isinstance(inputs, list) or not all(isinstance(pattern, str) for pattern in inputs):
+            raise ValueError(f"{project_id}: inputs must be a glob or a list of globs")
+        if project_id in projects:
+            raise ValueError(f"{project_id} is listed twice")
+        projects[project_id] = [str(base_dir / os.path.expanduser(pattern)) for pattern in inputs]
+    return projects
+
+
+class BatchRunner:
+    """Refresh many projects in one process from a manifest (--manifest).
+    
+    Projects run one after another on one ingestor, so imports happen once
+    and, with jobs > 1, every project parses on the same warmed worker pool.
+    With incremental=True all projects share one chunk cache (the ingestor's
+    cache_dir, by default <output_base_dir>/cache), which is safe because
+    entries are keyed by content hash and parser configuration. Outputs go
+    to the usual projects/<id>/Analysis/ folders; a project that fails is
+    recorded and the batch moves on. The consolidated report is returned and
+    written to <output_base_dir>/batch_report.json.
+    """
+    
+    def __init__(self, ingestor: RequirementsIngestor, projects: Dict[str, List[str]]):
+        self.ingestor = ingestor
+        self.projects = projects
+    
+    @staticmethod
+    def expand(patterns: List[str]) -> Tuple[List[str], List[str]]:
+        """Files matched by the globs in order, without repeats (directories contribute their supported files,
+        Maildirs are inputs themselves), and the globs that matched nothing"""
+        import glob
+        
+        extensions = set(_HANDLERS)
+        files: Dict[str, None] = {}
+        unmatched = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            for match in matches:
+                path = Path(match)
+                if path.is_dir() and _is_maildir(path):
+                    files.setdefault(match)
+                elif path.is_dir():
+                    for candidate in sorted(p for p in path.rglob("*") if p.suffix.lower() in extensions and p.is_file()):
+                        files.setdefault(str(candidate))
+                else:
+                    files.setdefault(match)
+            if not matches:
+                unmatched.append(pattern)
+        return list(files), unmatched
+    
+    def run(self) -> Dict[str, Any]:
+        """Ingest every project and write batch_report.json; returns the report"""
+        started = time.perf_counter()
+        generated_at = datetime.now().isoformat()
+        ingestor = copy.copy(self.ingestor)
+        if ingestor.incremental and ingestor.cache_dir is None:
+            ingestor.cache_dir = ingestor.output_base_dir / "cache"
+        
+        # Workers copy the cache settings when they start, so settle them first
+        ingestor._prepare_run()
+        pool = None
+        if ingestor.jobs > 1 and ingestor._executor is None:
+            pool = ingestor._executor = _start_warm_pool(ingestor)
+        try:
+            entries = [self._run_project(ingestor, project_id, patterns) for project_id, patterns in self.projects.items()]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        report = {
+            "generated_at": generated_at,
+            "tool_version": TOOL_VERSION,
+            "total_projects": len(entries),
+            "succeeded": sum(1 for entry in entries if entry["status"] == "ok"),
+            "failed": sum(1 for entry in entries if entry["status"] == "error"),
+            "skipped": sum(1 for entry in entries if entry["status"] == "no_inputs"),
+            "total_files": sum(entry["files"] for entry in entries),
+            "total_requirements": sum(entry["total_requirements"] for entry in entries),
+            "seconds": round(time.perf_counter() - started, 3),
+            "projects": entries
+        }
+        
+        report_file = ingestor.output_base_dir / "batch_report.json"
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = report_file.with_name(f".{report_file.name}.{_unique_suffix()}.tmp")
+        try:
+            ingestor.serializer.dump(report, temp_file)
+            os.replace(temp_file, report_file)
+        except BaseException:
+            if temp_file.exists():
+                temp_file.unlink()
+            raise
+        print(f"📦 Batch: {report['succeeded']} ok, {report['failed']} failed, {report['skipped']} without inputs; "
+              f"{report['total_requirements']} requirements in {report['seconds']}s")
+        print(f"   🧾 Report: {report_file}")
+        return report
+    
+    @staticmethod
+    def _run_project(ingestor: RequirementsIngestor, project_id: str, patterns: List[str]) -> Dict[str, Any]:
+        files, unmatched = BatchRunner.expand(patterns)
+        entry = {
+            "project_id": project_id,
+            "status": "no_inputs",
+            "files": len(files),
+            "failed_files": 0,
+            "total_requirements": 0,
+            "seconds": 0.0,
+            "output_dir": None,
+            "version": None,
+            "unmatched_patterns": unmatched,
+            "error": None
+        }
+        if not files:
+            print(f"⚠️ {project_id}: no input files matched; skipped")
+            return entry
         
-        return "\n".join(markdown_lines)
+        started = time.perf_counter()
+        try:
+            result = ingestor.process_files(files, project_id)
+        except Exception as e:
+            entry.update(status="error", error=str(e))
+            print(f"❌ {project_id}: {e}")
+        else:
+            entry.update(status="ok", failed_files=result["processing_summary"]["failed_files"],
+                         total_requirements=result["total_requirements"],
+                         output_dir=ingestor.last_output_paths["base_dir"],
+                         version=ingestor.last_output_paths.get("version"))
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        return entry
 
 
 def main():
@@ -659,23 +3415,143 @@ Examples:
   
   # Custom output directory
   python requirements_ingest.py PROJECT-001 requirements.pdf --output-dir /path/to/outputs
+  
+  # Parse files in parallel on 4 worker processes (0 = all CPUs)
+  python requirements_ingest.py PROJECT-001 specs/*.pdf --jobs 4
+  
+  # Re-ingest a project, re-parsing only files whose content changed
+  python requirements_ingest.py PROJECT-001 specs/* --incremental
+  
+  # Cluster requirements that were reworded across transcripts, emails and spec revisions
+  python requirements_ingest.py PROJECT-001 specs/* meetings/*.txt --near-dupes
+  
+  # Keep outputs current: re-ingest only the files that change under specs/ (Ctrl+C to stop)
+  python requirements_ingest.py PROJECT-001 specs/ --watch
+  
+  # Refresh every project listed in a manifest in one process (writes outputs/batch_report.json)
+  python requirements_ingest.py --manifest projects.yaml --jobs 4 --incremental
+  
+  # Serve ingest jobs from a warm worker pool (POST /ingest, GET /health)
+  python requirements_ingest.py --serve 127.0.0.1:8765 --jobs 4
+  
+  # Find the slow file or stage: per-stage stats in processing_log.json, cProfile in Analysis/profile.pstats
+  python requirements_ingest.py PROJECT-001 specs/* --profile
         """
     )
     
-    parser.add_argument("project_id", help="Project identifier for organizing outputs")
-    parser.add_argument("files", nargs="+", help="Input files to process (PDF, DOCX, MD, TXT, EML)")
+    parser.add_argument("project_id", nargs="?", help="Project identifier for organizing outputs")
+    parser.add_argument("files", nargs="*", help="Input files to process (PDF, DOCX, MD, TXT, EML, MBOX) and Maildir directories; other directories with --watch")
     parser.add_argument("--no-save", action="store_true", help="Output to console only (don't save files)")
     parser.add_argument("--output-dir", default="./outputs", help="Base output directory (default: ./outputs)")
     parser.add_argument("--console-output", action="store_true", help="Also print JSON to console")
+    parser.add_argument("--incremental", action="store_true", help="Reuse cached chunks for unchanged files (cache in Analysis/cache/)")
+    parser.add_argument("--chunk-size", type=int, default=300, help="Maximum chunk size in --chunk-unit (default: 300)")
+    parser.add_argument("--chunk-unit", choices=RequirementsIngestor.CHUNK_UNITS, default="words", help="Unit for --chunk-size (default: words)")
+    parser.add_argument("--chunk-overlap", type=int, default=0, help="Sentences repeated at the start of the next chunk (default: 0)")
+    parser.add_argument("--pdf-extraction", choices=PDF_EXTRACTION_MODES, default="tiered",
+                        help="PDF text extraction: tiered (text layer first, layout fallback) or layout (default: tiered)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for parsing files (default: 1, 0 = all CPUs)")
+    parser.add_argument("--no-dedupe", action="store_true", help="Keep repeated requirements as separate entries")
+    parser.add_argument("--near-dupes", action="store_true",
+                        help="Cluster reworded near-duplicate requirements (MinHash/LSH) and name a canonical one per cluster")
+    parser.add_argument("--near-dupe-threshold", type=float, default=0.7,
+                        help="Estimated word-bigram Jaccard similarity for --near-dupes (default: 0.7)")
+    parser.add_argument("--spans", action="store_true", help="Add exact character offsets (span) to each requirement")
+    parser.add_argument("--lock-timeout", type=float, default=None,
+                        help="Seconds to wait for another run publishing to the same project (default: wait indefinitely)")
+    parser.add_argument("--no-versions", action="store_true", help="Don't record this run in Analysis/versions/")
+    parser.add_argument("--md-page-size", type=int, default=0,
+                        help="Split requirements.md into pages of this many rows behind an index page (default: 0, one file)")
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output files (default: compact)")
+    parser.add_argument("--json-backend", choices=JSON_BACKENDS, default="auto",
+                        help="JSON encoder for output files: orjson, json (stdlib) or auto (orjson if installed)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-ingest inputs as they are added, changed or removed")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="--watch: seconds without further changes before re-ingesting (default: 1.0)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="--watch: seconds between checks when polling (default: 1.0)")
+    parser.add_argument("--poll", action="store_true", help="--watch: poll file stats instead of using inotify")
+    parser.add_argument("--manifest", metavar="PATH",
+                        help="Ingest every project in a JSON/YAML manifest (project ID -> input globs) instead of one project")
+    parser.add_argument("--cache-dir",
+                        help="--incremental: chunk cache shared by all projects (default: per project; <output-dir>/cache with --manifest)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="Run as an ingestion server on host:port or unix:/path/to.sock instead of processing files")
+    parser.add_argument("--max-concurrent", type=int, default=2, help="--serve: jobs run at the same time (default: 2)")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="--serve: jobs allowed to wait before new ones are refused with 503 (default: 16)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record per-file/per-stage time and memory in processing_log.json and dump cProfile stats "
+                             "(main process only with --jobs)")
     
     args = parser.parse_args()
+    if args.serve is None and args.manifest is None and (args.project_id is None or not args.files):
+        parser.error("project_id and at least one input file are required (unless --serve or --manifest)")
+    if args.manifest is not None and (args.project_id is not None or args.serve or args.watch or args.no_save):
+        parser.error("--manifest names the projects and inputs; it cannot be combined with a project_id, --serve, --watch or --no-save")
+    if args.serve is not None and (args.watch or args.no_save):
+        parser.error("--serve takes project IDs and files per job; it cannot be combined with --watch or --no-save")
+    if args.watch and args.no_save:
+        parser.error("--watch publishes to the output directory; it cannot be combined with --no-save")
     
     # Create ingestor with custom output directory
-    ingestor = RequirementsIngestor(output_base_dir=args.output_dir)
+    ingestor = RequirementsIngestor(
+        output_base_dir=args.output_dir,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        chunk_size=args.chunk_size,
+        chunk_unit=args.chunk_unit,
+        chunk_overlap=args.chunk_overlap,
+        pdf_extraction=args.pdf_extraction,
+        profile=args.profile,
+        spans=args.spans,
+        dedupe=not args.no_dedupe,
+        near_duplicates=args.near_dupes,
+        near_duplicate_threshold=args.near_dupe_threshold,
+        pretty=args.pretty,
+        json_backend=args.json_backend,
+        markdown_page_size=args.md_page_size,
+        versioning=not args.no_versions,
+        lock_timeout=args.lock_timeout,
+        cache_dir=args.cache_dir
+    )
+    
+    if args.manifest is not None:
+        try:
+            projects = load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            parser.error(f"--manifest {args.manifest}: {e}")
+        report = BatchRunner(ingestor, projects).run()
+        if report["failed"]:
+            sys.exit(1)
+        return
+    
+    if args.serve is not None:
+        IngestServer(ingestor, max_concurrent=args.max_concurrent, max_queue=args.max_queue).serve(args.serve)
+        return
+    
+    if args.watch:
+        ProjectWatcher(ingestor, args.project_id, args.files, debounce=args.debounce,
+                       poll_interval=args.poll_interval, use_inotify=not args.poll).run()
+        return
     
     # Process files
     save_to_file = not args.no_save
-    result = ingestor.process_files(args.files, args.project_id, save_to_file=save_to_file)
+    if args.profile:
+        import cProfile
+        import pstats
+        
+        profiler = cProfile.Profile()
+        result = profiler.runcall(ingestor.process_files, args.files, args.project_id, save_to_file=save_to_file)
+        if save_to_file:
+            stats_file = ingestor.output_base_dir / "projects" / args.project_id / "Analysis" / "profile.pstats"
+            profiler.dump_stats(str(stats_file))
+            print(f"   ⏱️ cProfile stats: {stats_file}")
+        # stderr keeps --no-save JSON output on stdout clean
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(20)
+    else:
+        result = ingestor.process_files(args.files, args.project_id, save_to_file=save_to_file)
     
     # Console output for backward compatibility or when explicitly requested
     if args.no_save or args.console_output:
@@ -13,7 +13,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from src.requirements_ingest import RequirementsIngestor
+    from src.requirements_ingest import (RequirementsIngestor, RequirementChunk, KeywordMatcher, register_handler,
+                                         content_digest, content_id)
 except ImportError as e:
     print(f"Import error: {e}")
     print("Make sure you're running from the requirements-ingest directory")
@@ -125,6 +126,52 @@ Product Team
     
     return test_files
 
+def write_test_pdf(path, pages, xobject=False):
+    """Write a minimal text-layer PDF: one list of lines per page (Helvetica, no dependencies).
+    
+    A page given as None is blank, with neither contents nor a /Resources dict.
+    With xobject=True each page's text is drawn through a form XObject
+    (the page content is just "q /Fm1 Do Q").
+    """
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_ref = 2 + sum(1 if lines is None else 3 if xobject else 2 for lines in pages)
+    page_refs = []
+    for lines in pages:
+        if lines is None:
+            objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] >>" % pages_ref)
+            page_refs.append(len(objects))
+            continue
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = ("BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({line}) '" for line in escaped) + " ET").encode('latin-1')
+        if xobject:
+            objects.append(b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 1 0 R >> >> "
+                           b"/Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            form_ref = len(objects)
+            stream = b"q /Fm1 Do Q"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        if xobject:
+            objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                           b"/Resources << /XObject << /Fm1 %d 0 R >> >> >>" % (pages_ref, len(objects), form_ref))
+        else:
+            objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                           b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_ref, len(objects)))
+        page_refs.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % ref for ref in page_refs) + b"] /Count %d >>" % len(page_refs))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_ref)
+    
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    
+    with open(path, 'wb') as f:
+        f.write(output)
+
 def validate_json_schema(result):
     """Validate the output matches expected JSON schema"""
     required_fields = ['project_id', 'requirements', 'glossary_suspects']
@@ -289,6 +336,1035 @@ def test_edge_cases():
     except Exception as e:
         print(f"❌ Edge case testing failed: {e}")
 
+def test_parallel_matches_serial():
+    """Parallel ingestion must produce the same requirements, in the same order, as serial"""
+    print("\n🔀 Testing Parallel Ingestion")
+    print("=" * 50)
+    
+    test_files = create_test_files()
+    file_list = list(test_files.values()) + ["/nonexistent/file.pdf"]
+    
+    try:
+        serial = RequirementsIngestor(jobs=1).process_files(file_list, "PARALLEL-TEST", save_to_file=False)
+        parallel = RequirementsIngestor(jobs=3).process_files(file_list, "PARALLEL-TEST", save_to_file=False)
+        
+        assert parallel['requirements'] == serial['requirements'], "Parallel output differs from serial"
+        assert sorted(parallel['glossary_suspects']) == sorted(serial['glossary_suspects'])
+        assert parallel['requirements'][-1]['id'].startswith("R-ERROR-")
+        print(f"✅ Parallel run matched serial run ({len(parallel['requirements'])} requirements)")
+    finally:
+        for file_path in test_files.values():
+            if os.path.exists(file_path):
+                os.unlink(file_path)
+
+def test_incremental_cache():
+    """Unchanged files are served from the chunk cache without re-parsing"""
+    print("\n♻️ Testing Incremental Cache")
+    print("=" * 50)
+    
+    test_files = create_test_files()
+    file_list = list(test_files.values())
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        try:
+            ingestor = RequirementsIngestor(output_base_dir=output_dir, incremental=True)
+            first = ingestor.process_files(file_list, "CACHE-TEST", save_to_file=False)
+            assert first['processing_summary']['cached_files'] == 0
+            
+            def fail_parse(source):
+                raise AssertionError(f"{source.path} should have come from the cache")
+            ingestor._process_single_file = fail_parse
+            
+            second = ingestor.process_files(file_list, "CACHE-TEST", save_to_file=False)
+            assert second['processing_summary']['cached_files'] == len(file_list)
+            assert [r['text'] for r in second['requirements']] == [r['text'] for r in first['requirements']]
+            print(f"✅ Re-ingest served {len(file_list)} files from cache")
+        finally:
+            for file_path in test_files.values():
+                if os.path.exists(file_path):
+                    os.unlink(file_path)
+
+def test_keyword_matcher_paths():
+    """Substring and compiled-regex matcher paths must agree on every signal"""
+    print("\n🔎 Testing Keyword Matcher")
+    print("=" * 50)
+    
+    ingestor = RequirementsIngestor()
+    tables = (ingestor.classification_keywords, ingestor.requirement_indicators, ingestor.confidence_keywords)
+    substring_matcher = KeywordMatcher(*tables)
+    
+    original_threshold = KeywordMatcher.REGEX_MIN_KEYWORDS
+    KeywordMatcher.REGEX_MIN_KEYWORDS = 1
+    try:
+        regex_matcher = KeywordMatcher(*tables)
+    finally:
+        KeywordMatcher.REGEX_MIN_KEYWORDS = original_threshold
+    
+    samples = [
+        "The system shall respond within 200ms",
+        "Users might maybe want a display",
+        "Mobile features are out of scope for phase 2",
+        "Response timeline depends on throughput",
+        "ok",
+    ]
+    for text in samples:
+        assert substring_matcher.scan(text) == regex_matcher.scan(text), text
+    
+    signals = substring_matcher.scan("The system shall respond within 200ms")
+    assert signals.is_candidate and signals.confidence == 1.0
+    print(f"✅ Matcher paths agree on {len(samples)} samples")
+
+def test_compact_chunk():
+    """Chunks are slotted, share tag tuples and encode to the same JSON as their dict form"""
+    print("\n📦 Testing Compact Chunks")
+    print("=" * 50)
+    
+    first = RequirementChunk("R-0001", "spec.md", "section 1, sent 2", 'The "system" shall log é', ["functional", "constraint"], 0.8)
+    second = RequirementChunk("R-0002", "".join(["spec", ".md"]), "section 1, sent 3", "Users must sign in", ["functional", "constraint"], 0.666)
+    
+    assert not hasattr(first, "__dict__")
+    assert first.tags is second.tags and first.source_file is second.source_file
+    for chunk in (first, second):
+        assert chunk.to_json() == json.dumps(chunk.to_dict(), ensure_ascii=False, separators=(",", ":"))
+    assert RequirementChunk(*first.astuple()) == first
+    print("✅ Compact chunk encoding matches json.dumps")
+
+def test_json_serializer():
+    """Output files are compact by default, indented with pretty=True, and identical across backends"""
+    print("\n🗜️ Testing JSON Serializer")
+    print("=" * 50)
+    
+    from src.requirements_ingest import JsonSerializer
+    
+    chunk = RequirementChunk("R-0001", "spec.md", "section 1", 'The "system" shall log é', ["functional"], 0.8)
+    document = {"project_id": "P", "requirements": [chunk], "processing_summary": {"total_requirements": 1}}
+    expected = {"project_id": "P", "requirements": [chunk.to_dict()], "processing_summary": {"total_requirements": 1}}
+    
+    backends = ['json', 'orjson'] if JsonSerializer().orjson is not None else ['json']
+    compact = [JsonSerializer(backend).dumps(document) for backend in backends]
+    assert all(encoded == compact[0] for encoded in compact)
+    assert compact[0] == json.dumps(expected, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+    assert JsonSerializer('json', pretty=True).dumps(document) == json.dumps(expected, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    test_files = create_test_files()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            RequirementsIngestor(output_base_dir=work_dir).process_files(list(test_files.values()), "JSON-TEST")
+            written = (Path(work_dir) / "projects" / "JSON-TEST" / "Analysis" / "requirements.json").read_text(encoding='utf-8')
+            assert "\n" not in written and json.loads(written)["total_requirements"] > 0
+    finally:
+        for file_path in test_files.values():
+            os.unlink(file_path)
+    print(f"✅ Compact output identical across backends: {', '.join(backends)}")
+
+def test_chunk_spans():
+    """spans=True keeps chunk text identical and records offsets into the loaded text"""
+    print("\n📍 Testing Chunk Spans")
+    print("=" * 50)
+    
+    content = "# Intro\nNotes only\n\n## Login\nThe system shall lock accounts. Users must  reset\npasswords!\n"
+    with tempfile.TemporaryDirectory() as work_dir:
+        md_path = Path(work_dir) / "spec.md"
+        md_path.write_text(content, encoding='utf-8')
+        plain = RequirementsIngestor().process_files([str(md_path)], "SPAN-TEST", save_to_file=False)
+        spanned = RequirementsIngestor(spans=True).process_files([str(md_path)], "SPAN-TEST", save_to_file=False)
+    
+    assert [r['text'] for r in spanned['requirements']] == [r['text'] for r in plain['requirements']]
+    span = spanned['requirements'][0]['span']
+    assert content[span['start']:span['end']] == "Login\nThe system shall lock accounts. Users must  reset\npasswords"
+    
+    chunk = RequirementsIngestor(spans=True)._split_into_chunks(content, "spec.md", "section 3", content.index("The"))[0]
+    assert chunk._text is None and chunk.text == "The system shall lock accounts Users must  reset\npasswords"
+    assert json.loads(chunk.to_json())['span']['end'] == span['end']
+    print(f"✅ Span {span['start']}-{span['end']} matches the source text")
+
+def test_content_ids_and_dedupe():
+    """IDs come from normalized content; repeats collapse into one chunk with every source"""
+    print("\n🆔 Testing Content IDs and Dedupe")
+    print("=" * 50)
+    
+    from src.requirements_ingest import _IngestSession
+    
+    shared = "The system shall encrypt all stored data."
+    with tempfile.TemporaryDirectory() as work_dir:
+        first = Path(work_dir) / "a.txt"
+        second = Path(work_dir) / "b.md"
+        first.write_text(shared, encoding='utf-8')
+        second.write_text("The system  shall encrypt all\nstored data.", encoding='utf-8')
+        files = [str(first), str(second)]
+        
+        deduped = RequirementsIngestor(output_base_dir=work_dir).process_files(files, "ID-TEST", save_to_file=False)
+        assert deduped['total_requirements'] == 1
+        merged = deduped['requirements'][0]
+        assert [s['source_file'] for s in merged['sources']] == ["a.txt", "b.md"]
+        assert deduped['processing_summary']['duplicates_merged'] == 1
+        
+        kept = RequirementsIngestor(dedupe=False).process_files(files, "ID-TEST", save_to_file=False)
+        assert [r['id'] for r in kept['requirements']] == [merged['id'], f"{merged['id']}-2"]
+        
+        streamed = list(RequirementsIngestor(output_base_dir=work_dir).iter_requirements(files, "ID-TEST"))
+        assert [c.id for c in streamed] == [merged['id']]
+        sidecar = Path(work_dir) / "projects" / "ID-TEST" / "Analysis" / "requirements.jsonl"
+        lines = [json.loads(line) for line in sidecar.read_text(encoding='utf-8').splitlines()]
+        assert lines[1] == {"duplicate_of": merged['id'], "source_file": "b.md", "location_hint": "section 1, sent 1"}
+    
+    # A prefix taken by different content falls back to a longer one
+    session = _IngestSession("ID-TEST", [])
+    chunk = RequirementChunk("", "a.txt", "text file", "Users must sign in", ["functional"], 0.9)
+    session._used_ids.add(content_id(content_digest(chunk.text)))
+    session.add_file_result({"file_path": "a.txt"}, [chunk], [], None)
+    assert chunk.id == content_id(content_digest(chunk.text), 12)
+    print(f"✅ Stable ID {merged['id']} shared by {len(merged['sources'])} sources")
+
+def test_near_duplicates():
+    """Reworded requirements share a cluster with one canonical member; unrelated ones stay out"""
+    print("\n🧬 Testing Near-Duplicate Clusters")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        files = {
+            "spec.txt": "The system shall authenticate users within 3 seconds using OAuth2 tokens issued by the identity provider.",
+            "email.txt": "The system must authenticate users within 3 seconds using OAuth2 tokens issued by the identity provider.",
+            "notes.txt": "The reporting module should export invoices to PDF every night for finance.",
+        }
+        paths = []
+        for name, text in files.items():
+            path = Path(work_dir) / name
+            path.write_text(text, encoding='utf-8')
+            paths.append(str(path))
+        
+        result = RequirementsIngestor(near_duplicates=True).process_files(paths, "NDC-TEST", save_to_file=False)
+        by_file = {r['source_file']: r for r in result['requirements']}
+        clusters = result['near_duplicate_clusters']
+        assert len(clusters) == 1 and clusters[0]['size'] == 2
+        assert clusters[0]['member_ids'] == [by_file['spec.txt']['id'], by_file['email.txt']['id']]
+        assert clusters[0]['canonical_id'] in clusters[0]['member_ids']
+        assert by_file['spec.txt']['cluster_id'] == by_file['email.txt']['cluster_id'] == clusters[0]['cluster_id']
+        assert 'cluster_id' not in by_file['notes.txt']
+        assert result['processing_summary']['near_duplicates'] == 1
+        
+        plain = RequirementsIngestor().process_files(paths, "NDC-TEST", save_to_file=False)
+        assert 'near_duplicate_clusters' not in plain and len(plain['requirements']) == 3
+    print(f"✅ {clusters[0]['size']} reworded requirements clustered as {clusters[0]['cluster_id']}")
+
+def test_markdown_report():
+    """requirements.md is streamed from chunks, the same from both entry points, and pages on request"""
+    print("\n📝 Testing Markdown Report")
+    print("=" * 50)
+    
+    test_files = create_test_files()
+    files = list(test_files.values())
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            analysis_dir = Path(work_dir) / "projects" / "MD-TEST" / "Analysis"
+            
+            def report() -> str:
+                text = (analysis_dir / "requirements.md").read_text(encoding='utf-8')
+                return "\n".join(line for line in text.splitlines() if not line.startswith(("**Generated**", "- **Processing time**")))
+            
+            result = RequirementsIngestor(output_base_dir=work_dir).process_files(files, "MD-TEST")
+            batch_report = report()
+            assert f"**Total Requirements**: {result['total_requirements']}" in batch_report
+            assert batch_report.count("\n| R-") == result['total_requirements']
+            
+            list(RequirementsIngestor(output_base_dir=work_dir).iter_requirements(files, "MD-TEST"))
+            assert report() == batch_report
+            
+            RequirementsIngestor(output_base_dir=work_dir, markdown_page_size=4).process_files(files, "MD-TEST")
+            pages = sorted(analysis_dir.glob("requirements-p*.md"))
+            assert len(pages) == -(-result['total_requirements'] // 4)
+            assert all(f"]({page.name})" in report() for page in pages)
+            assert sum(page.read_text(encoding='utf-8').count("\n| R-") for page in pages) == result['total_requirements']
+            
+            RequirementsIngestor(output_base_dir=work_dir).process_files(files, "MD-TEST")
+            assert not list(analysis_dir.glob("requirements-p*.md")) and not list(analysis_dir.glob(".*.tmp"))
+    finally:
+        for file_path in test_files.values():
+            os.unlink(file_path)
+    print(f"✅ Report of {result['total_requirements']} rows, {len(pages)} pages at 4 rows per page")
+
+def test_version_store():
+    """Each saved run becomes a version that stores only new records and reads back exactly"""
+    print("\n🗂️ Testing Version Store")
+    print("=" * 50)
+    
+    from src.requirements_ingest import VersionStore
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        spec = Path(work_dir) / "spec.txt"
+        spec.write_text("The system shall log every login.\n\nUsers must reset passwords by email.", encoding='utf-8')
+        analysis_dir = Path(work_dir) / "projects" / "VER-TEST" / "Analysis"
+        ingestor = RequirementsIngestor(output_base_dir=work_dir, chunk_size=6)
+        
+        first = ingestor.process_files([str(spec)], "VER-TEST")
+        spec.write_text("The system shall log every login.\n\nUsers must reset passwords by SMS.", encoding='utf-8')
+        second = ingestor.process_files([str(spec)], "VER-TEST")
+        list(ingestor.iter_requirements([str(spec)], "VER-TEST"))
+        
+        store = VersionStore(analysis_dir / "versions")
+        assert store.versions() == [1, 2, 3]
+        manifests = [json.loads((analysis_dir / "versions" / "manifests" / f"v000{n}.json").read_text()) for n in (1, 2, 3)]
+        assert [m["new_records"] for m in manifests] == [2, 1, 0]
+        assert ingestor.load_version("VER-TEST", 1)["requirements"] == first["requirements"]
+        assert store.load(2) == json.loads((analysis_dir / "requirements.json").read_text(encoding='utf-8'))
+        assert store.load()["requirements"] == second["requirements"]
+    print(f"✅ {len(manifests)} versions, {sum(m['new_records'] for m in manifests)} stored records")
+
+def test_atomic_publish():
+    """Concurrent runs on one project publish whole output sets under the project lock"""
+    print("\n🔒 Testing Atomic Publish")
+    print("=" * 50)
+    
+    import threading
+    from src.requirements_ingest import VersionStore, project_lock
+    
+    test_files = create_test_files()
+    files = list(test_files.values())
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            analysis_dir = Path(work_dir) / "projects" / "LOCK-TEST" / "Analysis"
+            runs = [threading.Thread(target=RequirementsIngestor(output_base_dir=work_dir).process_files,
+                                     args=(files[:i + 1], "LOCK-TEST")) for i in range(3)]
+            for run in runs:
+                run.start()
+            for run in runs:
+                run.join()
+            
+            assert VersionStore(analysis_dir / "versions").versions() == [1, 2, 3]
+            published = json.loads((analysis_dir / "requirements.json").read_text(encoding='utf-8'))
+            log = json.loads((analysis_dir / "processing_log.json").read_text(encoding='utf-8'))
+            assert published["total_requirements"] == log["processing_stats"]["total_requirements"]
+            assert not [p.name for p in analysis_dir.iterdir() if p.name.endswith((".tmp", ".partial"))]
+            
+            with project_lock(analysis_dir):
+                try:
+                    RequirementsIngestor(output_base_dir=work_dir, lock_timeout=0.1).process_files(files, "LOCK-TEST")
+                    assert False, "publishing should wait for the lock"
+                except TimeoutError:
+                    pass
+            assert not [p.name for p in analysis_dir.iterdir() if p.name.endswith((".tmp", ".partial"))]
+    finally:
+        for file_path in test_files.values():
+            os.unlink(file_path)
+    print("✅ 3 concurrent runs published as versions 1-3; a held lock times out cleanly")
+
+def test_project_watcher():
+    """Watch mode re-ingests only added and changed inputs and republishes the outputs"""
+    print("\n👀 Testing Project Watcher")
+    print("=" * 50)
+    
+    import threading
+    import time
+    from src.requirements_ingest import ProjectWatcher
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        inputs = Path(work_dir) / "specs"
+        inputs.mkdir()
+        (inputs / "auth.txt").write_text("The system shall lock accounts after 5 failed logins.", encoding='utf-8')
+        (inputs / "search.md").write_text("# Search\nSearch results must load within 200ms.", encoding='utf-8')
+        requirements_file = Path(work_dir) / "out" / "projects" / "WATCH-TEST" / "Analysis" / "requirements.json"
+        
+        ingestor = RequirementsIngestor(output_base_dir=str(Path(work_dir) / "out"), incremental=True)
+        ingested = []
+        ingest_file = ingestor._ingest_file
+        ingestor._ingest_file = lambda path: ingested.append(Path(path).name) or ingest_file(path)
+        
+        watcher = ProjectWatcher(ingestor, "WATCH-TEST", [str(inputs)], debounce=0.2, poll_interval=0.05, use_inotify=False)
+        assert watcher.start()['total_requirements'] == 2
+        cache_dir = Path(work_dir) / "out" / "projects" / "WATCH-TEST" / "Analysis" / "cache" / "chunks"
+        assert len(list(cache_dir.glob("*.json"))) == 2  # The first pass fills the chunk cache
+        
+        (inputs / "auth.txt").write_text("The system shall lock accounts after 3 failed logins.", encoding='utf-8')
+        (inputs / "export.txt").write_text("Users must export reports as CSV.", encoding='utf-8')
+        (inputs / "search.md").unlink()
+        ingested.clear()
+        result = watcher.refresh()
+        assert sorted(ingested) == ["auth.txt", "export.txt"]
+        assert [len(files) for files in watcher.last_changes] == [1, 1, 1]
+        assert sorted(r['text'] for r in result['requirements']) == [
+            "The system shall lock accounts after 3 failed logins", "Users must export reports as CSV"]
+        assert json.loads(requirements_file.read_text(encoding='utf-8'))['total_requirements'] == 2
+        
+        # The run loop picks up a burst of saves once it has been quiet for the debounce period
+        runner = threading.Thread(target=watcher.run)
+        runner.start()
+        try:
+            time.sleep(0.3)
+            for n in range(3):
+                (inputs / "export.txt").write_text(f"Users must export reports as CSV version {n}.", encoding='utf-8')
+                time.sleep(0.05)
+            deadline = time.monotonic() + 5
+            while "version 2" not in requirements_file.read_text(encoding='utf-8') and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+            runner.join()
+        assert "version 2" in requirements_file.read_text(encoding='utf-8')
+    print("✅ Only changed inputs were re-ingested")
+
+def test_inotify_recreated_directory():
+    """A watched directory that is deleted and recreated is watched again"""
+    print("\n🔁 Testing Inotify Rewatch")
+    print("=" * 50)
+    
+    import shutil
+    from src.requirements_ingest import _InotifyWaiter
+    
+    try:
+        waiter = _InotifyWaiter()
+    except (OSError, AttributeError):
+        print("⚠️ inotify not available, skipping")
+        return
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        specs = Path(work_dir) / "specs"
+        specs.mkdir()
+        try:
+            waiter.watch([specs])
+            shutil.rmtree(specs)
+            assert waiter.wait(1.0)
+            specs.mkdir()
+            waiter.watch([specs])
+            (specs / "new.txt").write_text("Users must export reports as CSV.", encoding='utf-8')
+            assert waiter.wait(1.0)
+        finally:
+            waiter.close()
+    print("✅ Recreated directory woke the watcher")
+
+def test_ingest_server():
+    """The ingestion server streams job progress, returns output paths and refuses jobs beyond its queue"""
+    print("\n🛰️ Testing Ingest Server")
+    print("=" * 50)
+    
+    import threading
+    import urllib.error
+    import urllib.request
+    from src.requirements_ingest import IngestServer
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        spec = Path(work_dir) / "auth.txt"
+        spec.write_text("The system shall lock accounts after 5 failed logins.", encoding='utf-8')
+        ingestor = RequirementsIngestor(output_base_dir=str(Path(work_dir) / "out"))
+        release = threading.Event()
+        ingest_file = ingestor._ingest_file
+        ingestor._ingest_file = lambda path: release.wait(5) and ingest_file(path)
+        
+        service = IngestServer(ingestor, max_concurrent=1, max_queue=0)
+        service.start()
+        server = service.make_server("127.0.0.1:0")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        
+        def post(job):
+            request = urllib.request.Request(f"{url}/ingest", data=json.dumps(job).encode('utf-8'),
+                                             headers={"Content-Type": "application/json"})
+            return urllib.request.urlopen(request, timeout=10)
+        
+        try:
+            job = {"project_id": "SERVE-TEST", "files": [str(spec)]}
+            response = post(job)
+            assert response.headers["Content-Type"] == "application/x-ndjson"
+            events = [json.loads(response.readline())]
+            assert events[0]["event"] == "queued"
+            
+            # The only slot is busy and nothing may queue: the next job is refused
+            try:
+                post(job)
+                assert False, "expected 503"
+            except urllib.error.HTTPError as e:
+                assert e.code == 503 and e.headers["Retry-After"] == "1"
+            
+            # Project IDs become directory names and must not escape the output directory
+            try:
+                post({"project_id": "../../escaped", "files": [str(spec)]})
+                assert False, "expected 400"
+            except urllib.error.HTTPError as e:
+                assert e.code == 400 and "project_id" in json.loads(e.read())["error"]
+            for project_id in ("", ".", "..", "a/b", "a\\b", "/abs"):
+                try:
+                    service.submit(project_id, [str(spec)])
+                    assert False, f"{project_id!r} should be rejected"
+                except ValueError:
+                    pass
+            assert not (Path(work_dir).parent / "escaped").exists()
+            
+            release.set()
+            events += [json.loads(line) for line in response]
+            assert [e["event"] for e in events] == ["queued", "started", "file", "done"]
+            assert events[2]["chunks"] == 1 and events[2]["error"] is None
+            done = events[-1]
+            assert done["total_requirements"] == 1
+            assert Path(done["output_paths"]["requirements_json"]).exists()
+            
+            health = json.loads(urllib.request.urlopen(f"{url}/health", timeout=10).read())
+            assert health["running"] == 0 and health["completed"] == 1
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+            service.close()
+    print("✅ Server streamed progress and applied backpressure")
+
+def test_ingest_server_cache():
+    """With a warm pool, incremental jobs read and fill the shared chunk cache"""
+    print("\n🗄️ Testing Ingest Server Cache")
+    print("=" * 50)
+    
+    from src.requirements_ingest import IngestServer
+    
+    test_files = list(create_test_files().values())
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            ingestor = RequirementsIngestor(output_base_dir=work_dir, jobs=2, incremental=True)
+            service = IngestServer(ingestor)
+            service.start()
+            try:
+                first = service.submit("CACHE-SERVE", test_files, save_to_file=False)
+                second = service.submit("CACHE-SERVE", test_files, save_to_file=False)
+            finally:
+                service.close()
+            assert first["requirements"]["processing_summary"]["cached_files"] == 0
+            assert second["requirements"]["processing_summary"]["cached_files"] == len(test_files)
+            assert second["requirements"]["requirements"] == first["requirements"]["requirements"]
+            assert any((Path(work_dir) / "cache" / "chunks").iterdir())
+    finally:
+        for f in test_files:
+            os.unlink(f)
+    print("✅ Second job was served from the cache")
+
+def test_async_api():
+    """The asyncio API matches process_files, runs batches concurrently, times files out and cancels cleanly"""
+    print("\n⚡ Testing Async API")
+    print("=" * 50)
+    
+    import asyncio
+    import time
+    
+    test_files = list(create_test_files().values())
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            ingestor = RequirementsIngestor(output_base_dir=work_dir)
+            expected = ingestor.process_files(test_files, "SYNC-TEST", save_to_file=False)
+            
+            async def run_batches():
+                streamed = [chunk.id async for chunk in ingestor.aiter_requirements(test_files, "ASYNC-STREAM")]
+                processed = await asyncio.gather(*(ingestor.aprocess_files(test_files, f"ASYNC-{n}") for n in range(3)))
+                return streamed, processed
+            
+            streamed, processed = asyncio.run(run_batches())
+            assert streamed == [r['id'] for r in expected['requirements']]
+            for output in processed:
+                assert output['requirements'] == expected['requirements']
+            analysis_dir = Path(work_dir) / "projects" / "ASYNC-STREAM" / "Analysis"
+            assert len((analysis_dir / "requirements.jsonl").read_text(encoding='utf-8').splitlines()) == len(streamed)
+            
+            # A slow file is abandoned after file_timeout; the others are still ingested
+            ingest_file = ingestor._ingest_file
+            def slow_ingest(path, source=None):
+                if path == test_files[0]:
+                    time.sleep(0.5)
+                return ingest_file(path, source)
+            ingestor._ingest_file = slow_ingest
+            output = asyncio.run(ingestor.aprocess_files(test_files, "ASYNC-TIMEOUT", save_to_file=False, file_timeout=0.1))
+            assert output['processing_summary']['failed_files'] == 1
+            rest = ingestor.process_files(test_files[1:], "SYNC-REST", save_to_file=False)
+            errors = [r for r in output['requirements'] if r['id'].startswith("R-ERROR")]
+            assert len(errors) == 1 and "Timed out" in errors[0]['text']
+            assert [r['id'] for r in output['requirements'] if r not in errors] == [r['id'] for r in rest['requirements']]
+            
+            # Cancelling the consumer while a file is being parsed discards the batch's partial outputs
+            async def cancel_midway():
+                async def consume():
+                    return [chunk async for chunk in ingestor.aiter_requirements(test_files, "ASYNC-CANCEL")]
+                task = asyncio.create_task(consume())
+                await asyncio.sleep(0.1)
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    return True
+            
+            assert asyncio.run(cancel_midway())
+            cancel_dir = Path(work_dir) / "projects" / "ASYNC-CANCEL" / "Analysis"
+            assert not list(cancel_dir.glob("*.partial")) and not (cancel_dir / "requirements.jsonl").exists()
+            time.sleep(0.5)  # Let the abandoned parse finish before the files are removed
+    finally:
+        for f in test_files:
+            os.unlink(f)
+    print("✅ Async batches matched process_files")
+
+def test_batch_manifest():
+    """A manifest refreshes several projects in one run with a shared cache and a consolidated report"""
+    print("\n📦 Testing Batch Manifest")
+    print("=" * 50)
+    
+    from src.requirements_ingest import BatchRunner, load_manifest
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        work = Path(work_dir)
+        (work / "alpha").mkdir()
+        (work / "beta").mkdir()
+        shared = "The system shall lock accounts after 5 failed logins."
+        (work / "alpha" / "auth.txt").write_text(shared, encoding='utf-8')
+        (work / "alpha" / "search.md").write_text("# Search\nSearch results must load within 200ms.", encoding='utf-8')
+        (work / "beta" / "auth-copy.txt").write_text(shared, encoding='utf-8')
+        manifest = work / "projects.json"
+        manifest.write_text(json.dumps({"projects": {
+            "ALPHA": ["alpha/*.txt", "alpha/*.md"],
+            "BETA": "beta",
+            "GAMMA": ["gamma/*.pdf"]
+        }}), encoding='utf-8')
+        
+        projects = load_manifest(str(manifest))
+        assert list(projects) == ["ALPHA", "BETA", "GAMMA"]
+        ingestor = RequirementsIngestor(output_base_dir=str(work / "out"), incremental=True)
+        report = BatchRunner(ingestor, projects).run()
+        
+        assert (report["succeeded"], report["failed"], report["skipped"]) == (2, 0, 1)
+        assert report["total_requirements"] == 3
+        entries = {entry["project_id"]: entry for entry in report["projects"]}
+        assert entries["GAMMA"]["unmatched_patterns"] == [str(work / "gamma/*.pdf")]
+        assert json.loads((work / "out" / "batch_report.json").read_text(encoding='utf-8')) == report
+        
+        # BETA's copy of the auth spec was parsed for ALPHA already
+        beta_log = json.loads(Path(entries["BETA"]["output_dir"], "processing_log.json").read_text(encoding='utf-8'))
+        assert beta_log["input_files"][0].get("from_cache") is True
+        assert (work / "out" / "cache" / "chunks").is_dir()
+        
+        yaml_manifest = work / "projects.yaml"
+        yaml_manifest.write_text("projects:\n  - project_id: ALPHA\n    inputs: [alpha/*.md]\n", encoding='utf-8')
+        try:
+            assert load_manifest(str(yaml_manifest)) == {"ALPHA": [str(work / "alpha/*.md")]}
+        except ValueError as e:
+            assert "PyYAML" in str(e)  # PyYAML is optional
+        
+        manifest.write_text(json.dumps([{"project_id": "ALPHA"}, {"project_id": "ALPHA"}]), encoding='utf-8')
+        try:
+            load_manifest(str(manifest))
+            assert False, "expected ValueError"
+        except ValueError as e:
+            assert "twice" in str(e)
+    print("✅ Batch report covers every project")
+
+def test_mailbox_ingestion():
+    """mbox files and Maildir directories are ingested per message, with attachments routed to their handlers"""
+    print("\n📬 Testing Mailbox Ingestion")
+    print("=" * 50)
+    
+    try:
+        import pdfplumber
+    except ImportError:
+        print("⚠️ pdfplumber not installed, skipping")
+        return
+    
+    import mailbox
+    from email.message import EmailMessage
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, "attached.pdf")
+        write_test_pdf(pdf_path, [["Intro page"], ["The system shall encrypt stored invoices with AES-256."]])
+        
+        def message(message_id, body, attachments=()):
+            msg = EmailMessage()
+            msg["From"] = "pm@example.com"
+            msg["Subject"] = "Requirements"
+            msg["Message-ID"] = f"<{message_id}@example.com>"
+            msg.set_content(body)
+            for filename, maintype, subtype, data in attachments:
+                msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=filename)
+            return msg
+        
+        messages = [
+            message("first", "Users must reset passwords via email link.",
+                    [("spec.pdf", "application", "pdf", Path(pdf_path).read_bytes()),
+                     ("logo.png", "image", "png", b"\x89PNG not really")]),
+            message("second", "From the start, the API shall return JSON responses.",
+                    [("notes.md", "text", "markdown", "# Notes\nReports should export to CSV nightly.".encode('utf-8'))]),
+        ]
+        mbox_path = os.path.join(work_dir, "inbox.mbox")
+        box = mailbox.mbox(mbox_path)
+        for msg in messages:
+            box.add(msg)
+        box.close()
+        maildir = mailbox.Maildir(os.path.join(work_dir, "inbox-maildir"))
+        for msg in messages:
+            maildir.add(msg)
+        key = next(iter(maildir.keys()))
+        maildir_message = maildir[key]
+        maildir_message.set_subdir("cur")
+        maildir_message.add_flag("S")
+        maildir[key] = maildir_message  # Read messages live in cur/ with flags in the file name
+        
+        ingestor = RequirementsIngestor()
+        results = {}
+        for path in (mbox_path, os.path.join(work_dir, "inbox-maildir")):
+            file_info, chunks, _, error = ingestor._ingest_file(path)
+            assert error is None, error
+            assert file_info["messages"] == 2 and file_info["attachments"] == 2 and file_info["attachments_skipped"] == 1
+            results[path] = sorted((chunk.location_hint.split(", sent")[0], chunk.text) for chunk in chunks)
+            assert {chunk.source_file for chunk in chunks} == {Path(path).name}
+        
+        expected = [
+            ("message first@example.com, attachment spec.pdf, page 2", "The system shall encrypt stored invoices with AES-256"),
+            ("message first@example.com, body", "Users must reset passwords via email link"),
+            ("message second@example.com, attachment notes.md, section 2", "Notes\nReports should export to CSV nightly"),
+            ("message second@example.com, body", "From the start, the API shall return JSON responses"),
+        ]
+        assert list(results.values()) == [expected, expected]
+        
+        # Marking a message read renames it but keeps the Maildir's content hash
+        source = ingestor._ingest_file(os.path.join(work_dir, "inbox-maildir"))[0]["file_hash"]
+        for key in maildir.keys():
+            maildir_message = maildir[key]
+            maildir_message.add_flag("R")
+            maildir[key] = maildir_message
+        assert ingestor._ingest_file(os.path.join(work_dir, "inbox-maildir"))[0]["file_hash"] == source
+        
+        # The async API opens Maildir directories and mbox files the same way
+        import asyncio
+        mailboxes = [mbox_path, os.path.join(work_dir, "inbox-maildir")]
+        output = asyncio.run(ingestor.aprocess_files(mailboxes, "ASYNC-MAILBOX", save_to_file=False))
+        assert output['processing_summary']['failed_files'] == 0
+        assert output['requirements'] == ingestor.process_files(mailboxes, "SYNC-MAILBOX", save_to_file=False)['requirements']
+        
+        # A forwarded message usually has no filename; its body and attachments are read all the same
+        forward = message("forward", "See the thread below.")
+        forward.add_attachment(message("original", "Invoices must be archived for 7 years.",
+                                       [("rules.md", "text", "markdown", b"Auditors shall get read-only access.")]))
+        eml_path = os.path.join(work_dir, "forward.eml")
+        with open(eml_path, 'wb') as f:
+            f.write(bytes(forward))
+        file_info, chunks, _, error = ingestor._ingest_file(eml_path)
+        assert error is None and file_info["attachments"] == 2
+        assert sorted((chunk.location_hint.split(", sent")[0], chunk.text) for chunk in chunks if "forwarded" in chunk.location_hint) == [
+            ("forwarded message original@example.com, attachment rules.md, section 1", "Auditors shall get read-only access"),
+            ("forwarded message original@example.com, body", "Invoices must be archived for 7 years"),
+        ]
+        
+        # Cache entries written before emails had attachment chunks are not served
+        import src.requirements_ingest as ingest_module
+        cache_format = ingest_module.CHUNK_CACHE_FORMAT
+        cache_ingestor = RequirementsIngestor(output_base_dir=work_dir, incremental=True)
+        ingest_module.CHUNK_CACHE_FORMAT = 2
+        try:
+            cache_ingestor._prepare_run("CACHE-FORMAT")
+            cache_ingestor._store_cached_chunks(eml_path, file_info["file_hash"], chunks[:1], [])
+            assert cache_ingestor._ingest_file(eml_path)[0].get("from_cache")
+        finally:
+            ingest_module.CHUNK_CACHE_FORMAT = cache_format
+        cache_ingestor._prepare_run("CACHE-FORMAT")
+        file_info, cached_chunks, _, _ = cache_ingestor._ingest_file(eml_path)
+        assert not file_info.get("from_cache") and len(cached_chunks) == len(chunks)
+    print("✅ Messages and attachments located by Message-ID")
+
+def test_glossary_index():
+    """Glossary frequencies, contexts and sources come from the inverted index"""
+    print("\n📚 Testing Glossary Index")
+    print("=" * 50)
+    
+    texts = [
+        "The API shall respond quickly. Logs are kept",
+        "Rapid deployment is needed. The system must scale",
+        "The API gateway must log requests. API keys rotate",
+        "Nothing relevant here",
+    ]
+    chunks = [RequirementChunk(f"R-{i}", "spec.md", "section 1", text, ["functional"], 0.8) for i, text in enumerate(texts)]
+    
+    glossary = RequirementsIngestor()._create_glossary_output("GLOSSARY-TEST", ["API", "Missing"], chunks)
+    terms = {t["term"]: t for t in glossary["extracted_terms"]}
+    
+    # Substring semantics: "Rapid" contains "api"
+    assert terms["API"]["frequency"] == 3
+    assert "Missing" not in terms
+    assert terms["API"]["contexts"] == ["The API shall respond quickly", "Rapid deployment is needed", "The API gateway must log requests"]
+    assert glossary["suggested_definitions"][0]["sources"] == ["R-0", "R-1", "R-2"]
+    print("✅ Glossary index matches substring semantics")
+
+def test_streaming_pipeline():
+    """iter_requirements yields chunks incrementally and writes the JSONL sidecar"""
+    print("\n🌊 Testing Streaming Pipeline")
+    print("=" * 50)
+    
+    test_files = create_test_files()
+    file_list = list(test_files.values())
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        try:
+            ingestor = RequirementsIngestor(output_base_dir=output_dir)
+            batch = ingestor.process_files(file_list, "STREAM-TEST", save_to_file=False)
+            streamed = list(ingestor.iter_requirements(file_list, "STREAM-TEST"))
+            
+            assert [c.text for c in streamed] == [r['text'] for r in batch['requirements']]
+            
+            analysis_dir = Path(output_dir) / "projects" / "STREAM-TEST" / "Analysis"
+            with open(analysis_dir / "requirements.jsonl", encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+            assert [line['id'] for line in lines] == [c.id for c in streamed]
+            
+            with open(analysis_dir / "processing_log.json", encoding='utf-8') as f:
+                log = json.load(f)
+            assert log['processing_stats']['total_requirements'] == len(streamed)
+            assert (analysis_dir / "glossary.json").exists()
+            print(f"✅ Streamed {len(streamed)} requirements to requirements.jsonl")
+        finally:
+            for file_path in test_files.values():
+                if os.path.exists(file_path):
+                    os.unlink(file_path)
+
+def test_chunk_packing():
+    """Chunk size units and sentence overlap"""
+    print("\n✂️ Testing Chunk Packing")
+    print("=" * 50)
+    
+    text = "The system shall do A. The user must do B. The system shall log C. Users must see D."
+    
+    ingestor = RequirementsIngestor(chunk_size=12, chunk_unit='words', chunk_overlap=1)
+    chunks = ingestor._split_into_chunks(text, "spec.txt", "text file")
+    assert [c.text for c in chunks] == [
+        "The system shall do A The user must do B",
+        "The user must do B The system shall log C",
+        "The system shall log C Users must see D",
+    ]
+    assert [c.location_hint for c in chunks] == ["text file, sent 2", "text file, sent 3", "text file, sent 4"]
+    
+    ingestor = RequirementsIngestor(chunk_size=40, chunk_unit='chars')
+    chunks = ingestor._split_into_chunks(text, "spec.txt", "text file")
+    assert all(len(c.text) <= 40 for c in chunks) and len(chunks) == 2
+    
+    try:
+        RequirementsIngestor(chunk_unit='pages')
+        assert False, "Unknown chunk unit should be rejected"
+    except ValueError:
+        pass
+    print("✅ Chunk packing respects size units and overlap")
+
+def test_pdf_page_cache():
+    """Editing one PDF page only re-extracts that page in incremental mode"""
+    print("\n📄 Testing PDF Page Cache")
+    print("=" * 50)
+    
+    try:
+        import pdfplumber
+    except ImportError:
+        print("⚠️ pdfplumber not installed, skipping")
+        return
+    
+    pages = [[f"Page {i}: the system shall process request {i}."] for i in range(5)]
+    extracted = []
+    original_extract = pdfplumber.page.Page.extract_text
+    
+    def counting_extract(page, *args, **kwargs):
+        extracted.append(page.page_number)
+        return original_extract(page, *args, **kwargs)
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, "spec.pdf")
+        write_test_pdf(pdf_path, pages)
+        ingestor = RequirementsIngestor(output_base_dir=work_dir, incremental=True, pdf_extraction='layout')
+        
+        pdfplumber.page.Page.extract_text = counting_extract
+        try:
+            first = ingestor.process_files([pdf_path], "PDF-CACHE-TEST", save_to_file=False)
+            assert extracted == [1, 2, 3, 4, 5]
+            
+            extracted.clear()
+            pages[2] = ["Page 2: the user must approve the edited request."]
+            write_test_pdf(pdf_path, pages)
+            second = ingestor.process_files([pdf_path], "PDF-CACHE-TEST", save_to_file=False)
+            assert extracted == [3], f"Only the edited page should be re-extracted, got {extracted}"
+        finally:
+            pdfplumber.page.Page.extract_text = original_extract
+        
+        assert [r['location_hint'] for r in second['requirements']] == [r['location_hint'] for r in first['requirements']]
+        assert "approve" in second['requirements'][2]['text']
+        
+        # The page cache is best effort: an unwritable cache does not fail the PDF
+        cache_dir = Path(work_dir) / "blocked"
+        cache_dir.mkdir()
+        (cache_dir / "pages").write_text("not a directory", encoding='utf-8')
+        blocked = RequirementsIngestor(output_base_dir=work_dir, incremental=True, pdf_extraction='layout', cache_dir=str(cache_dir))
+        output = blocked.process_files([pdf_path], "PDF-CACHE-BLOCKED", save_to_file=False)
+        assert [r['text'] for r in output['requirements']] == [r['text'] for r in second['requirements']]
+        print("✅ Only the edited page was re-extracted")
+
+def test_pdf_page_cache_xobjects():
+    """Pages drawing their text through form XObjects get distinct page cache keys"""
+    print("\n🧾 Testing PDF Page Cache With Form XObjects")
+    print("=" * 50)
+    
+    try:
+        import pdfplumber
+    except ImportError:
+        print("⚠️ pdfplumber not installed, skipping")
+        return
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        a_path = os.path.join(work_dir, "a.pdf")
+        b_path = os.path.join(work_dir, "b.pdf")
+        write_test_pdf(a_path, [["The system shall encrypt stored passwords."]], xobject=True)
+        write_test_pdf(b_path, [["The operator must approve every refund."]], xobject=True)
+        cache_dir = os.path.join(work_dir, "cache")
+        
+        ingestor = RequirementsIngestor(output_base_dir=work_dir, incremental=True, pdf_extraction='layout', cache_dir=cache_dir)
+        result = ingestor.process_files([a_path, b_path], "PDF-XOBJECT-TEST", save_to_file=False)
+        texts = " ".join(r['text'] for r in result['requirements'])
+        assert "encrypt" in texts and "refund" in texts, texts
+        
+        other = RequirementsIngestor(output_base_dir=work_dir, incremental=True, pdf_extraction='layout', cache_dir=cache_dir)
+        result = other.process_files([b_path], "PDF-XOBJECT-OTHER", save_to_file=False)
+        assert "refund" in result['requirements'][0]['text']
+        print("✅ XObject-drawn pages are cached per content")
+
+def test_pdf_tiered_extraction():
+    """Clean PDFs are read from the text layer; the tier is logged per page"""
+    print("\n🪜 Testing Tiered PDF Extraction")
+    print("=" * 50)
+    
+    try:
+        import pdfplumber, PyPDF2
+    except ImportError:
+        print("⚠️ pdfplumber/PyPDF2 not installed, skipping")
+        return
+    
+    assert RequirementsIngestor._pdf_text_is_garbled("(cid:12)(cid:15)(cid:9)")
+    assert RequirementsIngestor._pdf_text_is_garbled("Thesystemshallauthenticateuserswithinthreeseconds")
+    assert not RequirementsIngestor._pdf_text_is_garbled("The system shall authenticate users in 3 seconds.")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, "spec.pdf")
+        write_test_pdf(pdf_path, [["The system shall export reports."], ["Users must sign in within 5 seconds."]])
+        
+        tiered = RequirementsIngestor(output_base_dir=work_dir)
+        result = tiered.process_files([pdf_path], "TIER-TEST")
+        layout = RequirementsIngestor(pdf_extraction='layout').process_files([pdf_path], "TIER-TEST", save_to_file=False)
+        assert [r['text'] for r in result['requirements']] == [r['text'] for r in layout['requirements']]
+        
+        log_path = Path(work_dir) / "projects" / "TIER-TEST" / "Analysis" / "processing_log.json"
+        with open(log_path, encoding='utf-8') as f:
+            pages = json.load(f)["input_files"][0]["pdf_pages"]
+        assert pages == [{"page": 1, "tier": "text_layer"}, {"page": 2, "tier": "text_layer"}]
+        
+        # A blank page without a /Resources dict has no text layer; the rest of the PDF is still read
+        write_test_pdf(pdf_path, [["The system shall export reports."], None])
+        file_info, chunks, _, error = RequirementsIngestor()._ingest_file(pdf_path)
+        assert error is None, error
+        assert [chunk.text for chunk in chunks] == ["The system shall export reports"]
+        assert file_info["pdf_pages"] == [{"page": 1, "tier": "text_layer"}, {"page": 2, "tier": "no_text_layer"}]
+        print("✅ Text-layer tier matched layout output")
+
+def test_pdf_pages_in_memory():
+    """Page-parallel extraction of an in-memory PDF ships its bytes once per worker, not with every task"""
+    print("\n🧩 Testing In-Memory PDF Page Extraction")
+    print("=" * 50)
+    
+    try:
+        import pdfplumber
+    except ImportError:
+        print("⚠️ pdfplumber not installed, skipping")
+        return
+    
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+    from src.requirements_ingest import SourceDocument, PDF_PAGES_PER_TASK
+    
+    pages = [[f"Page {i}: the system shall process request {i}."] for i in range(2 * PDF_PAGES_PER_TASK + 1)]
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, "attached.pdf")
+        write_test_pdf(pdf_path, pages)
+        pdf_bytes = Path(pdf_path).read_bytes()
+    
+    task_sizes = []
+    original_submit = ProcessPoolExecutor.submit
+    def recording_submit(executor, fn, *args, **kwargs):
+        task_sizes.append(len(pickle.dumps(args)))
+        return original_submit(executor, fn, *args, **kwargs)
+    ProcessPoolExecutor.submit = recording_submit
+    try:
+        ingestor = RequirementsIngestor(jobs=2, pdf_extraction='layout')
+        with SourceDocument("attached.pdf", pdf_bytes) as source:
+            chunks = ingestor._process_pdf(source)
+    finally:
+        ProcessPoolExecutor.submit = original_submit
+    
+    assert [chunk.text for chunk in chunks] == [f"Page {i}: the system shall process request {i}" for i in range(len(pages))]
+    assert task_sizes and max(task_sizes) < len(pdf_bytes)
+    print("✅ Page tasks carried page ranges only")
+
+def test_stage_profile():
+    """profile=True records per-file and per-stage stats in processing_log.json"""
+    print("\n⏱️ Testing Stage Profile")
+    print("=" * 50)
+    
+    test_files = create_test_files()
+    file_list = list(test_files.values())
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        try:
+            plain = RequirementsIngestor(output_base_dir=output_dir).process_files(file_list, "PROFILE-TEST", save_to_file=False)
+            ingestor = RequirementsIngestor(output_base_dir=output_dir, profile=True)
+            result = ingestor.process_files(file_list, "PROFILE-TEST")
+            assert [r['text'] for r in result['requirements']] == [r['text'] for r in plain['requirements']]
+            
+            log_path = Path(output_dir) / "projects" / "PROFILE-TEST" / "Analysis" / "processing_log.json"
+            with open(log_path, encoding='utf-8') as f:
+                log = json.load(f)
+            profile = log["profile"]
+            assert set(profile["stages"]) == {"hash", "parse", "split", "classify", "glossary", "serialize"}
+            assert profile["memory_traced"] and profile["chunks_emitted"] == len(result['requirements'])
+            assert profile["bytes_read"] == sum(f["file_size"] for f in log["input_files"])
+            for file_info in log["input_files"]:
+                stages = file_info["profile"]["stages"]
+                assert stages["hash"]["calls"] == 1 and stages["parse"]["calls"] == 1
+                assert sum(stage["seconds"] for stage in stages.values()) <= file_info["profile"]["seconds"] + 1e-3
+            assert "profile" not in result["processing_summary"]
+            
+            list(ingestor.iter_requirements(file_list, "PROFILE-TEST"))
+            with open(log_path, encoding='utf-8') as f:
+                assert "serialize" in json.load(f)["profile"]["batch_stages"]
+            print(f"✅ Profiled {len(log['input_files'])} files across {len(profile['stages'])} stages")
+        finally:
+            for file_path in test_files.values():
+                if os.path.exists(file_path):
+                    os.unlink(file_path)
+
+def test_handler_registry():
+    """Handlers resolve by extension, custom ones can be registered, format libraries load lazily"""
+    print("\n🧩 Testing Handler Registry")
+    print("=" * 50)
+    
+    import subprocess
+    from src import requirements_ingest
+    
+    def csv_handler(ingestor, source):
+        return [ingestor._create_chunk(row, source.path, f"row {i}")
+                for i, row in enumerate(source.text().splitlines(), 1) if row.strip()]
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = Path(work_dir) / "reqs.csv"
+        csv_path.write_text("The system shall export CSV\nThe user must log in\n", encoding='utf-8')
+        
+        original = dict(requirements_ingest._HANDLERS)
+        try:
+            register_handler("CSV", csv_handler)
+            result = RequirementsIngestor().process_files([str(csv_path)], "HANDLER-TEST", save_to_file=False)
+            assert [r['location_hint'] for r in result['requirements']] == ["row 1", "row 2"]
+        finally:
+            requirements_ingest._HANDLERS.clear()
+            requirements_ingest._HANDLERS.update(original)
+        
+        # A text-only run never imports the PDF/DOCX stacks
+        md_path = Path(work_dir) / "reqs.md"
+        md_path.write_text("# Login\nThe system shall authenticate users.\n", encoding='utf-8')
+        probe = (
+            "import sys; sys.path.insert(0, 'src'); from requirements_ingest import RequirementsIngestor; "
+            f"RequirementsIngestor().process_files([{str(md_path)!r}], 'LAZY-TEST', save_to_file=False); "
+            "print(sorted(m for m in ('pdfplumber', 'PyPDF2', 'docx') if m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, check=True).stdout
+        assert output.strip().endswith("[]"), output
+    print("✅ Custom handler used; no format libraries imported for Markdown")
+
 def performance_test():
     """Test performance with larger content"""
     print("\n⚡ Performance Testing")
@@ -337,6 +1413,87 @@ def main():
         # Test edge cases
         test_edge_cases()
         
+        # Parallel ingestion
+        test_parallel_matches_serial()
+        
+        # Incremental re-ingestion
+        test_incremental_cache()
+        
+        # Streaming API
+        test_streaming_pipeline()
+        
+        # Keyword matcher paths
+        test_keyword_matcher_paths()
+        
+        # Compact chunks
+        test_compact_chunk()
+        
+        # JSON serialization
+        test_json_serializer()
+        
+        # Chunk spans
+        test_chunk_spans()
+        
+        # Content IDs and dedupe
+        test_content_ids_and_dedupe()
+        
+        # Near-duplicate clustering
+        test_near_duplicates()
+        
+        # Markdown report
+        test_markdown_report()
+        
+        # Version store
+        test_version_store()
+        
+        # Atomic publish
+        test_atomic_publish()
+        
+        # Watch mode
+        test_project_watcher()
+        
+        # inotify directory recreation
+        test_inotify_recreated_directory()
+        
+        # Ingest server
+        test_ingest_server()
+        
+        # Ingest server chunk cache
+        test_ingest_server_cache()
+        
+        # Async API
+        test_async_api()
+        
+        # Batch manifest
+        test_batch_manifest()
+        
+        # Mailbox ingestion
+        test_mailbox_ingestion()
+        
+        # Glossary index
+        test_glossary_index()
+        
+        # Chunk packing
+        test_chunk_packing()
+        
+        # PDF page cache
+        test_pdf_page_cache()
+        
+        # PDF page cache with form XObjects
+        test_pdf_page_cache_xobjects()
+        
+        # Tiered PDF extraction
+        test_pdf_tiered_extraction()
+        
+        # In-memory PDF pages
+        test_pdf_pages_in_memory()
+        
+        # Stage profiling
+        test_stage_profile()
+        
+        # Handler registry
+        test_handler_registry()
+        
         # Performance testing
         performance_test()
         